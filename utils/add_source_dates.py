@@ -11,14 +11,8 @@ import os
 import sys
 from pathlib import Path
 from lxml import etree
-
-# TEI namespace
-TEI_NS = "http://www.tei-c.org/ns/1.0"
-XML_NS = "http://www.w3.org/XML/1998/namespace"
-NAMESPACES = {
-    'tei': TEI_NS,
-    'xml': XML_NS
-}
+from tei_reader import (TEI_NS, BIBL_XPATH, NOTE_XPATH, SIGNATURE_DATE_XPATH,
+                        UNTYPED_DATE_XPATH, parse_file, write_file)
 
 
 def process_file(filepath):
@@ -28,24 +22,10 @@ def process_file(filepath):
     Returns True if file was modified, False otherwise.
     """
     # Parse the XML file with settings that preserve formatting
-    parser = etree.XMLParser(
-        remove_blank_text=False,
-        remove_comments=False,
-        strip_cdata=False
-    )
-
-    # Read the file
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Parse the XML
-    root = etree.fromstring(content.encode('utf-8'), parser)
+    root = parse_file(filepath)
 
     # Find the bibl element
-    bibl_elements = root.xpath(
-        '//tei:teiHeader/tei:fileDesc/tei:sourceDesc/tei:bibl',
-        namespaces=NAMESPACES
-    )
+    bibl_elements = BIBL_XPATH(root)
 
     if not bibl_elements:
         print(f"  Warning: No <bibl> element found in {filepath.name}")
@@ -54,17 +34,14 @@ def process_file(filepath):
     bibl = bibl_elements[0]
 
     # Check if there's already a date element without a type attribute
-    existing_dates = bibl.xpath('tei:date[not(@type)]', namespaces=NAMESPACES)
+    existing_dates = UNTYPED_DATE_XPATH(bibl)
 
     if existing_dates:
         # Date without type attribute already exists, skip
         return False
 
     # Find the date in the signature section (may be nested in other elements)
-    signature_dates = root.xpath(
-        '//tei:div[@type="signature"]//tei:date',
-        namespaces=NAMESPACES
-    )
+    signature_dates = SIGNATURE_DATE_XPATH(root)
 
     if not signature_dates:
         print(f"  Warning: No signature date found in {filepath.name}")
@@ -85,7 +62,7 @@ def process_file(filepath):
     new_date.tail = '\n        '
 
     # Find the right position to insert the date (after <note> if it exists, otherwise at the end)
-    note_elements = bibl.xpath('tei:note', namespaces=NAMESPACES)
+    note_elements = NOTE_XPATH(bibl)
     if note_elements:
         # Insert after the last note element
         last_note = note_elements[-1]
@@ -102,13 +79,7 @@ def process_file(filepath):
         bibl.append(new_date)
 
     # Write back with minimal changes
-    result = etree.tostring(root,
-                           encoding='unicode',
-                           pretty_print=False,
-                           method='xml')
-
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(result)
+    write_file(root, filepath)
 
     return True
 
@@ -1,49 +1,28 @@
-import re
+from pathlib import Path
 
-from export_ids import xml_files
+from series_coverage import find_gaps, load_series, scan
 
-NUMBER_PATTERN = re.compile("52-(\\d+)-\\d+\\.xml")
+# Pattern and official yearly totals (§52a) live in series.json
+SECTION_52A = next(s for s in load_series() if s.name == "52")
+
+SECTION_52A_QUESTION_STATS = SECTION_52A.official_totals
 
 def match_number_part(string) -> int|None:
-    found_matches = NUMBER_PATTERN.split(str(string))
+    matched = SECTION_52A.match(Path(string).name)
 
-    if found_matches is not None and len(found_matches) > 1:
-        return int(found_matches[1])
+    if matched is not None:
+        return matched[1]
 
     return None
 
-SECTION_52A_QUESTION_STATS = {
-    2008: 39,
-    2009: 115,
-    2010: 85,
-    2011: 46,
-    2012: 60,
-    2013: 66,
-    2014: 108,
-    2015: 71,
-    2016: 100,
-    2017: 86,
-    2018: 88,
-    2019: 120,
-    2020: 169,
-    2021: 222,
-    2022: 135,
-    2023: 141,
-    2024: 119
-}
-
-def count_stats():
+def count_stats(found):
 
     results = dict()
 
-    for x in range(2008, 2025):
-        results[x] = 0
-
-    for x in range(2008, 2025):
-        files = xml_files("../parliamentary-questions/" + str(x))
-        results[x] = len(list(files))
+    for x in SECTION_52A_QUESTION_STATS:
+        results[x] = len(found.get(x, ()))
 
-    for x in range(2008, 2025):
+    for x in SECTION_52A_QUESTION_STATS:
 
         number_of_records = str(results[x]).rjust(3, ' ')
         total_records = str(SECTION_52A_QUESTION_STATS[x]).rjust(3, ' ')
@@ -57,7 +36,7 @@ def count_stats():
     totals = 0
     records = 0
 
-    for x in range(2008, 2025):
+    for x in SECTION_52A_QUESTION_STATS:
         totals += SECTION_52A_QUESTION_STATS[x]
         records += results[x]
 
@@ -65,29 +44,19 @@ def count_stats():
     print("{:.1f}".format((records/totals) * 100))
 
 def main():
-    files = xml_files("../parliamentary-questions/2012")
-
-    found_numbers = set()
-
-    for f in files:
-        found_numbers.add(match_number_part(f))
-
-    found_number_list = list(found_numbers)
-
-    found_number_list.sort()
-
-    last_number = 0
-
-    for number in found_number_list:
+    # One walk over all years instead of one glob per year
+    found = scan("../parliamentary-questions", [SECTION_52A])[SECTION_52A.name]
 
-        if number - last_number > 1:
-            print("Found a gap!")
+    for year in sorted(found):
 
-        last_number = number
+        for first, last in find_gaps(found[year], SECTION_52A_QUESTION_STATS.get(year)):
 
-        print(number)
+            if first == last:
+                print("Found a gap! " + str(year) + ": " + str(first))
+            else:
+                print("Found a gap! " + str(year) + ": " + str(first) + "-" + str(last))
 
-    count_stats()
+    count_stats(found)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
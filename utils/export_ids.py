@@ -21,165 +21,41 @@
 # SOFTWARE.
 import argparse
 from pathlib import Path
-from typing import Iterator
-from lxml import etree
 from id_utils import generate_b32_id
+from persons import PersonIndex
+from shards import shard_order, write_shards
+from source_map import SourceMap
+from stats_cube import StatsCube
+from tei_reader import (XML_ID, ID_VALUE_XPATH, SENTENCE_XPATH, TeiDocument, document_category,
+                        document_path, parse_file, read_document, write_file, xml_files)
+from xrefs import XrefIndex
 import json
 
-def xml_files(root: str | Path) -> Iterator[Path]:
-    root = Path(root)
-    for p in root.rglob("*"):
-        # robust across case-sensitive (Linux) and case-insensitive (macOS) filesystems
-        if p.is_file() and p.suffix.lower() == ".xml":
-            yield p
 
+def extract_sentences(doc: TeiDocument) -> list[tuple[str, str, int | None]]:
+    return [(sentence.id, sentence.text, doc.year)
+            for sentence in doc.sentences if sentence.extractable]
 
-def parse_sentences_for_extraction(filepath) -> list[tuple[str, str, int | None]]:
-    # Parse with a parser that preserves whitespace
-    parser = etree.XMLParser(remove_blank_text=False,
-                             remove_comments=False,
-                             strip_cdata=False)
-
-    # Read the file
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Parse the XML
-    tree = etree.fromstring(content.encode('utf-8'), parser)
-
-    results = []
-
-    # Define namespace map
-    namespaces = {
-        'xml': 'http://www.w3.org/XML/1998/namespace',
-        'tei': 'http://www.tei-c.org/ns/1.0'
-    }
-
-    # Extract year from publication date in sourceDesc (optional)
-    # Get first date without type attribute from sourceDesc
-    year = None
-    try:
-        date_elements = tree.xpath('//tei:sourceDesc//tei:date[@when and not(@type)]', namespaces=namespaces)
-        if date_elements:
-            date_when = date_elements[0].get('when')
-            if date_when and len(date_when) >= 4:
-                # Extract year from date (e.g., "2025-09-03" -> 2025)
-                year = int(date_when[:4])
-    except (ValueError, IndexError, AttributeError):
-        # If date parsing fails, year remains None
-        pass
-
-    # Find elements and add xml:id
-    ## for element in tree.findall('.//{http://www.tei-c.org/ns/1.0}s'):
-    for element in tree.xpath('//tei:s[@xml:id] | //tei:seg[@type="sentence"][@xml:id]', namespaces=namespaces):
-
-        found_id = element.get('{http://www.w3.org/XML/1998/namespace}id')
-
-        cert = element.get('cert')
-
-        xml_lang = element.get('{http://www.w3.org/XML/1998/namespace}lang')
-
-        if cert is not None:
-            cert_lower = cert.lower()
-            
-            if 'low' == cert_lower:
-                continue 
-
-        if found_id is not None and len(found_id) == 10:
-
-            if xml_lang == 'da':
-                continue
-
-            element_text_content = element.xpath('string()')
 
-            if element_text_content is not None:
-
-                results.append((found_id, " ".join(element_text_content.strip().split()), year))
-
-    # # Write back with minimal changes
-    # result = etree.tostring(tree,
-    #                        encoding='unicode',
-    #                        pretty_print=False,
-    #                        method='xml')
-    #
-    # with open(filepath, 'w', encoding='utf-8') as f:
-    #     f.write(result)
-
-    return results
+def parse_sentences_for_extraction(filepath) -> list[tuple[str, str, int | None]]:
+    return extract_sentences(read_document(filepath))
 
 
 def parse_sentences(filepath) -> list[str]:
-    # Parse with a parser that preserves whitespace
-    parser = etree.XMLParser(remove_blank_text=False, 
-                             remove_comments=False,
-                             strip_cdata=False)
-    
-    # Read the file
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    ## print("Processing file: " + str(filepath))
-
-    # Parse the XML
-    tree = etree.fromstring(content.encode('utf-8'), parser)
-
-    results = []
-
-    # Define namespace map
-    namespaces = {
-        'xml': 'http://www.w3.org/XML/1998/namespace'
-    }
-
-    # Find elements and add xml:id
-    ## for element in tree.findall('.//{http://www.tei-c.org/ns/1.0}s'):
-    for element in tree.xpath('//*[@xml:id]', namespaces=namespaces):
-
-        found_id = element.get('{http://www.w3.org/XML/1998/namespace}id')
-
-        if found_id is not None and len(found_id) == 10:
-
-            # element.set('{http://www.w3.org/XML/1998/namespace}id', id_value)
-
-            results.append(found_id)
-
-    
-    # # Write back with minimal changes
-    # result = etree.tostring(tree,
-    #                        encoding='unicode',
-    #                        pretty_print=False,
-    #                        method='xml')
-    #
-    # with open(filepath, 'w', encoding='utf-8') as f:
-    #     f.write(result)
-
-    return results
+    return ID_VALUE_XPATH(parse_file(filepath))
 
 
 def add_ids_to_file(filepath: str, used_ids: set) -> list[str]:
-    # Parse with a parser that preserves whitespace
-    parser = etree.XMLParser(remove_blank_text=False,
-                             remove_comments=False,
-                             strip_cdata=False)
-
-    # Read the file
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Parse the XML
-    tree = etree.fromstring(content.encode('utf-8'), parser)
+    # Generated IDs are added to `used_ids` so the same set can be passed
+    # on to the next file
+    tree = parse_file(filepath)
 
     results = []
 
-    # Define namespace map
-    namespaces = {
-        'xml': 'http://www.w3.org/XML/1998/namespace',
-        'tei': 'http://www.tei-c.org/ns/1.0'
-    }
-
     # Find elements and add xml:id
-    for element in tree.xpath('//tei:s | //tei:seg[@type="sentence"]', namespaces=namespaces):
+    for element in SENTENCE_XPATH(tree):
 
-        found_id = element.get('{http://www.w3.org/XML/1998/namespace}id')
+        found_id = element.get(XML_ID)
 
         if found_id is None or len(found_id) <= 0:
 
@@ -188,50 +64,62 @@ def add_ids_to_file(filepath: str, used_ids: set) -> list[str]:
             if generated_id in used_ids:
                 raise RuntimeError(f"Generated ID '{generated_id}' is already in use.")
 
-            element.set('{http://www.w3.org/XML/1998/namespace}id', generated_id)
+            element.set(XML_ID, generated_id)
+            used_ids.add(generated_id)
 
-            results.append(found_id)
+            results.append(generated_id)
 
-    # Write back with minimal changes
-    result = etree.tostring(tree,
-                           encoding='unicode',
-                           pretty_print=False,
-                           method='xml')
-
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(result)
+    # Only touch files that actually got new IDs
+    if results:
+        write_file(tree, filepath)
 
     return results
 
 # Example usage
 
-def do_work(target_file: str):
-
-    print("target file: " + target_file)
-
+def collect_used_ids(root: str | Path = "../") -> set[str]:
     used_ids = set()
 
-    for file in xml_files("../"):
-        output = parse_sentences(file)
+    for file in xml_files(root):
+        used_ids.update(parse_sentences(file))
 
-        for found_id in output:
-            used_ids.add(found_id)
+    return used_ids
 
-    print(len(used_ids))
 
+def write_used_ids(used_ids: set):
     with open("used_ids.txt", "w") as file:
         for line in used_ids:
             file.write(line + "\n")
 
+
+def do_work(target_file: str, used_ids: set | None = None):
+
+    print("target file: " + target_file)
+
+    if used_ids is None:
+        used_ids = collect_used_ids()
+
+    print(len(used_ids))
+
+    write_used_ids(used_ids)
+
     add_ids_to_file(target_file, used_ids)
 
-def process_files(relevant_files_path):
+def process_files(relevant_files_path, shard_dir: str | Path | None = None):
     # relevant_files = xml_files("/home/rani/Repositories/tingmal/parliamentary-questions")
     # relevant_files = xml_files("/home/rani/Repositories/tingmal/decisions")
     relevant_files = xml_files(relevant_files_path)
 
+    # Scan the corpus for used IDs once instead of once per file
+    used_ids = collect_used_ids()
+
     for relevant_file in relevant_files:
-        do_work(str(relevant_file))
+        print("target file: " + str(relevant_file))
+        add_ids_to_file(str(relevant_file), used_ids)
+
+    print(len(used_ids))
+
+    write_used_ids(used_ids)
 
     # do_work("/home/rani/Repositories/tingmal/legislation/vegleiding_til_standard_leigusattmalan.xml")
     # do_work("/home/rani/Repositories/tingmal/decisions/datueftirlitid.xml")
@@ -245,11 +133,29 @@ def process_files(relevant_files_path):
 
     sentences = []
 
+    # Statistics are collected in the same pass over the corpus
+    cube = StatsCube()
+    xrefs = XrefIndex()
+    persons = PersonIndex()
+    source_map = SourceMap()
+
     for file in xml_files("../"):
-        output = parse_sentences_for_extraction(file)
+        doc_path = document_path(file, "../")
+        doc = read_document(file)
+        output = extract_sentences(doc)
+
+        cube.add_document(doc, doc_path)
+        xrefs.add_document(doc, doc_path)
+        persons.add_document(doc, doc_path)
+        source_map.add_document(doc, doc_path)
 
         for item in output:
-            sentences.append(item)
+            sentences.append(item + (doc_path,))
+
+    cube.save('../stats_cube.json')
+    xrefs.save('../xrefs.json')
+    persons.save('../persons.json')
+    source_map.save('../source_map.json')
 
     results: list[dict[str, str | int | None]] = []
 
@@ -259,6 +165,8 @@ def process_files(relevant_files_path):
             'id': item[0],
             'text': item[1],
             'year': item[2],
+            'doc': item[3],
+            'category': document_category(item[3]),
         }
 
         results.append(formatted)
@@ -280,6 +188,10 @@ def process_files(relevant_files_path):
 
             f.write(json.dumps(result, ensure_ascii=False) + '\n')
 
+    # Optionally also as compressed shards for distribution, by year and ID
+    # so that readers can skip blocks by year and look sentences up by ID
+    if shard_dir is not None:
+        write_shards(sorted(deduplicated_sentences, key=shard_order), shard_dir)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Frequent n-grams and collocations per year or category in bounded memory.
+
+The n-grams (2..5 by default) of sentences.jsonl go into a count-min
+sketch per stratum (year, category or the whole corpus) instead of an exact
+Counter, so small strata are not swamped by collisions with large ones.
+Per stratum and n, a
+bounded candidate list keeps the n-grams with the highest estimated counts
+(heavy hitters). Memory therefore depends on the sketch size, the number of
+strata and --top, not on the number of distinct n-grams.
+
+The input is split into byte ranges that worker processes count
+independently; their sketches are merged by adding counters, and the
+candidates are re-estimated against the merged sketches. A second pass
+over the input then counts the surviving candidates and their words
+exactly, which only needs memory for them. Each n-gram is reported with
+its exact count and pointwise mutual information
+(log2 of P(w1..wn) / (P(w1) ... P(wn))).
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import math
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from sketches import CountMinSketch
+
+# Words without surrounding punctuation; keeps "m.a.", "2019-20" and "§" out of the way
+WORD_RE = re.compile(r"\w+(?:[-./]\w+)*", re.UNICODE)
+
+MIN_N = 2
+MAX_N = 5
+
+# Sketch width per stratum: fewer, larger strata get wider sketches
+DEFAULT_WIDTHS = {'all': 1 << 20, 'category': 1 << 18, 'year': 1 << 16}
+
+
+def tokenize(text: str) -> list[str]:
+    return WORD_RE.findall(text.lower())
+
+
+def stratum(obj: dict, by: str) -> str:
+    if by == 'all':
+        return 'all'
+
+    value = obj.get(by)
+
+    return 'unknown' if value is None else str(value)
+
+
+class NgramCounter:
+    """Count-min sketches of n-grams per stratum plus heavy-hitter candidates per stratum and n."""
+
+    def __init__(self, min_n: int = MIN_N, max_n: int = MAX_N, top_k: int = 50,
+                 width: int = CountMinSketch.DEFAULT_WIDTH, depth: int = CountMinSketch.DEFAULT_DEPTH):
+        self.min_n = min_n
+        self.max_n = max_n
+        self.top_k = top_k
+        self.width = width
+        self.depth = depth
+        # stratum -> sketch of its n-grams
+        self.sketches: dict[str, CountMinSketch] = {}
+        # (stratum, n) -> number of n-grams counted
+        self.totals: dict[tuple[str, int], int] = defaultdict(int)
+        # (stratum, n) -> {n-gram: last estimate, or exact count after recount()}
+        self.candidates: dict[tuple[str, int], dict[str, int]] = defaultdict(dict)
+        # stratum -> {word: exact count} of the words in the candidates, after recount()
+        self.unigrams: dict[str, dict[str, int]] = {}
+
+    @property
+    def capacity(self) -> int:
+        # Track more than we report so late risers are not crowded out
+        return 4 * self.top_k
+
+    def _sketch(self, group: str) -> CountMinSketch:
+        sketch = self.sketches.get(group)
+
+        if sketch is None:
+            sketch = self.sketches[group] = CountMinSketch(self.width, self.depth)
+
+        return sketch
+
+    def add_tokens(self, group: str, tokens: list[str]):
+        sketch = self._sketch(group)
+
+        for n in range(1, self.max_n + 1):
+            if len(tokens) < n:
+                break
+
+            self.totals[(group, n)] += len(tokens) - n + 1
+
+            # Words are counted exactly in the second pass; keep their mass out of the sketch
+            if n < self.min_n:
+                continue
+
+            candidates = self.candidates[(group, n)]
+            ngrams = [" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1)]
+            estimates = sketch.update(ngrams)
+
+            for ngram, estimate in zip(ngrams, estimates):
+                if estimate > 1:
+                    candidates[ngram] = estimate
+
+            if len(candidates) > 2 * self.capacity:
+                self._prune(candidates)
+
+    def _prune(self, candidates: dict[str, int]):
+        keep = sorted(candidates.items(), key=lambda item: item[1], reverse=True)[:self.capacity]
+        candidates.clear()
+        candidates.update(keep)
+
+    def merge(self, other: NgramCounter) -> NgramCounter:
+        for group, sketch in other.sketches.items():
+            self._sketch(group).merge(sketch)
+
+        for key, total in other.totals.items():
+            self.totals[key] += total
+
+        for key, others in other.candidates.items():
+            candidates = self.candidates[key]
+            candidates.update(others)
+
+        # Counts from one worker are partial; re-estimate against the merged sketches
+        for (group, _), candidates in self.candidates.items():
+            sketch = self.sketches[group]
+
+            for ngram in candidates:
+                candidates[ngram] = sketch.estimate(ngram)
+
+            self._prune(candidates)
+
+        return self
+
+    def wanted(self) -> dict[tuple[str, int], set[str]]:
+        """The candidates and, as (stratum, 1), their words: what `recount` needs counted."""
+        wanted: dict[tuple[str, int], set[str]] = defaultdict(set)
+
+        for (group, n), candidates in self.candidates.items():
+            wanted[(group, n)].update(candidates)
+
+            for ngram in candidates:
+                wanted[(group, 1)].update(ngram.split(" "))
+
+        return dict(wanted)
+
+    def recount(self, counts: dict[tuple[str, int], Counter]):
+        """Replace the estimates by exact counts of the `wanted` n-grams."""
+        for key, candidates in self.candidates.items():
+            exact = counts.get(key, {})
+
+            for ngram in candidates:
+                candidates[ngram] = exact.get(ngram, 0)
+
+        self.unigrams = {group: dict(exact) for (group, n), exact in counts.items() if n == 1}
+
+    def pmi(self, group: str, ngram: str, count: int) -> float:
+        """PMI of an n-gram seen `count` times; needs the word counts from `recount`."""
+        words = ngram.split(" ")
+        p_ngram = count / self.totals[(group, len(words))]
+        unigram_total = self.totals[(group, 1)]
+        unigrams = self.unigrams[group]
+        p_words = 1.0
+
+        for word in words:
+            p_words *= unigrams[word] / unigram_total
+
+        return math.log2(p_ngram / p_words)
+
+    def top(self, min_count: int = 1) -> dict[str, dict[int, list[dict]]]:
+        """Top n-grams per stratum and n, most frequent first; call after `recount`."""
+        result: dict[str, dict[int, list[dict]]] = defaultdict(dict)
+
+        for (group, n), candidates in sorted(self.candidates.items()):
+            ranked = sorted(candidates.items(), key=lambda item: (-item[1], item[0]))
+            result[group][n] = [
+                {'ngram': ngram, 'count': count, 'pmi': round(self.pmi(group, ngram, count), 2)}
+                for ngram, count in ranked[:self.top_k] if count >= max(min_count, 1)
+            ]
+
+        return dict(result)
+
+
+def read_range(path: str, start: int, end: int, by: str):
+    """(stratum, tokens) of the lines that start within [start, end) of `path`."""
+    with open(path, 'rb') as f:
+        if start > 0:
+            # Skip the line that the previous range is responsible for
+            f.seek(start - 1)
+            f.readline()
+
+        while f.tell() < end:
+            line = f.readline()
+
+            if not line:
+                break
+
+            obj = json.loads(line)
+            yield stratum(obj, by), tokenize(obj['text'])
+
+
+def count_range(path: str, start: int, end: int, by: str, options: dict) -> NgramCounter:
+    counter = NgramCounter(**options)
+
+    for group, tokens in read_range(path, start, end, by):
+        counter.add_tokens(group, tokens)
+
+    return counter
+
+
+def recount_range(path: str, start: int, end: int, by: str,
+                  wanted: dict[tuple[str, int], set[str]]) -> dict[tuple[str, int], Counter]:
+    """Exact counts of the `wanted` n-grams in [start, end) of `path`."""
+    counts: dict[tuple[str, int], Counter] = defaultdict(Counter)
+    lengths = sorted({n for _, n in wanted})
+
+    for group, tokens in read_range(path, start, end, by):
+        for n in lengths:
+            ngrams = wanted.get((group, n))
+
+            if not ngrams:
+                continue
+
+            found = [" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1)]
+            counts[(group, n)].update(ngram for ngram in found if ngram in ngrams)
+
+    return dict(counts)
+
+
+def _map_ranges(func, path: str | Path, by: str, jobs: int, arg) -> list:
+    size = os.path.getsize(path)
+    bounds = [size * i // jobs for i in range(jobs + 1)]
+
+    if jobs == 1:
+        return [func(str(path), 0, size, by, arg)]
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(func, str(path), bounds[i], bounds[i + 1], by, arg)
+                   for i in range(jobs)]
+        return [future.result() for future in futures]
+
+
+def count_ngrams(path: str | Path, by: str = 'all', jobs: int | None = None, **options) -> NgramCounter:
+    jobs = jobs or os.cpu_count() or 1
+    counters = _map_ranges(count_range, path, by, jobs, options)
+    counter = counters[0]
+
+    for other in counters[1:]:
+        counter.merge(other)
+
+    # Second pass: exact counts for the candidates that survived
+    counts: dict[tuple[str, int], Counter] = defaultdict(Counter)
+
+    for partial in _map_ranges(recount_range, path, by, jobs, counter.wanted()):
+        for key, found in partial.items():
+            counts[key].update(found)
+
+    counter.recount(counts)
+
+    return counter
+
+
+def render_markdown(top: dict[str, dict[int, list[dict]]], by: str) -> str:
+    parts = []
+
+    for group in sorted(top, key=lambda g: (g == 'unknown', g)):
+        for n, rows in top[group].items():
+            if not rows:
+                continue
+
+            title = f"{n}-grams" if by == 'all' else f"{by.capitalize()} {group}: {n}-grams"
+            lines = [f"### {title}\n", "| N-gram | Count | PMI |", "|---|---:|---:|"]
+            lines += [f"| {row['ngram']} | {row['count']:,} | {row['pmi']:.2f} |" for row in rows]
+            parts.append("\n".join(lines) + "\n")
+
+    return "\n".join(parts)
+
+
+def main():
+    script_dir = Path(__file__).parent
+
+    parser = argparse.ArgumentParser(description="Frequent n-grams and collocations in bounded memory.")
+    parser.add_argument('input', nargs='?', type=Path, default=script_dir.parent / 'sentences.jsonl',
+                        help="input JSONL (default: ../sentences.jsonl)")
+    parser.add_argument('--by', choices=('all', 'year', 'category'), default='all',
+                        help="report per year or per category (default: whole corpus)")
+    parser.add_argument('--min-n', type=int, default=MIN_N, help=f"shortest n-gram (default: {MIN_N})")
+    parser.add_argument('--max-n', type=int, default=MAX_N, help=f"longest n-gram (default: {MAX_N})")
+    parser.add_argument('--top', type=int, default=50, help="n-grams per stratum and n (default: 50)")
+    parser.add_argument('--min-count', type=int, default=3, help="drop n-grams seen fewer times (default: 3)")
+    parser.add_argument('--width', type=int, default=None,
+                        help="sketch width per stratum; memory is 4 bytes × width × depth per stratum "
+                             "(default: 2**20 for all, 2**18 per category, 2**16 per year)")
+    parser.add_argument('--depth', type=int, default=CountMinSketch.DEFAULT_DEPTH, help="sketch depth")
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument('--json', type=Path, default=Path('NGRAMS.json'),
+                        help="JSON output (default: NGRAMS.json)")
+    parser.add_argument('--markdown', type=Path, default=Path('NGRAMS.md'),
+                        help="Markdown output (default: NGRAMS.md)")
+    args = parser.parse_args()
+
+    if not 2 <= args.min_n <= args.max_n:
+        parser.error("need 2 <= --min-n <= --max-n")
+
+    if not args.input.exists():
+        print(f"Error: Input not found: {args.input}")
+        sys.exit(1)
+
+    counter = count_ngrams(args.input, by=args.by, jobs=args.jobs,
+                           min_n=args.min_n, max_n=args.max_n, top_k=args.top,
+                           width=args.width or DEFAULT_WIDTHS[args.by], depth=args.depth)
+    top = counter.top(args.min_count)
+
+    args.json.write_text(json.dumps(top, ensure_ascii=False, indent=2), encoding='utf-8')
+    args.markdown.write_text(render_markdown(top, args.by), encoding='utf-8')
+
+    print(f"Wrote top {args.top} n-grams for {len(top)} strata to {args.json} and {args.markdown}")
+
+
+if __name__ == '__main__':
+    main()
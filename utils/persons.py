@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Person and speaker index: who wrote or said which sentence.
+
+People are found in the header (<author><persName> of the source bibl), in
+the questioner and respondent blocks of parliamentary questions and as
+speakers of debate utterances (<u who="#...">). Each sentence is attributed
+to the nearest of these that applies:
+
+    <u who>                          speaker
+    <div type="response">            respondent
+    <div type="question">, ...       questioner
+    <text source="#bibl">            the author of that bibl
+    otherwise                        the header author(s) of the enclosing TEI
+
+Persons are identified by their tingdata.fo code where a persName carries
+one, and otherwise by a slug of their name ("Helena Dam á Neystabø" ->
+helena-dam-a-neystaboe). Debate speaker IDs are slugged the same way
+("FinnbogiIsakson" -> finnbogi-isakson), but do not always transliterate
+like it (hogni-hoydal), so an uncoded ID is merged through the slugs of
+its listPerson names as well: into the one code they belong to, or else
+into the ID they spell.
+
+    python3 persons.py build
+    python3 persons.py list --role questioner
+    python3 persons.py show "Hanna Jensen" --sentences
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import re
+import sys
+import unicodedata
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import NamedTuple
+from lxml import etree
+from tei_reader import (NAMESPACES, TEI_NS, XML_ID, TeiDocument, document_path, normalize_space,
+                        read_document, xml_files)
+
+DEFAULT_INDEX = Path(__file__).parent.parent / 'persons.json'
+
+AUTHOR = 'author'
+QUESTIONER = 'questioner'
+RESPONDENT = 'respondent'
+SPEAKER = 'speaker'
+ROLES = (AUTHOR, QUESTIONER, RESPONDENT, SPEAKER)
+
+# Division types whose sentences are the questioner's
+QUESTION_DIVS = {'question', 'parliamentary-question'}
+
+TINGDATA_PERSON = 'https://tingdata.fo/person/'
+
+TEI_TAG = f"{{{TEI_NS}}}TEI"
+TEXT_TAG = f"{{{TEI_NS}}}text"
+DIV_TAG = f"{{{TEI_NS}}}div"
+U_TAG = f"{{{TEI_NS}}}u"
+ROLE_NAME_TAG = f"{{{TEI_NS}}}roleName"
+
+TEI_XPATH = etree.XPath('//tei:TEI', namespaces=NAMESPACES)
+SOURCE_BIBL_XPATH = etree.XPath('tei:teiHeader//tei:sourceDesc//tei:bibl[tei:author]', namespaces=NAMESPACES)
+AUTHOR_XPATH = etree.XPath('tei:author//tei:persName', namespaces=NAMESPACES)
+QUESTIONER_XPATH = etree.XPath('.//tei:div[@type="questioner"]//tei:persName', namespaces=NAMESPACES)
+RESPONDENT_XPATH = etree.XPath('.//tei:div[@type="respondent"]//tei:persName', namespaces=NAMESPACES)
+LIST_PERSON_XPATH = etree.XPath('//tei:listPerson/tei:person[@xml:id]', namespaces=NAMESPACES)
+PERSON_NAME_XPATH = etree.XPath('tei:persName', namespaces=NAMESPACES)
+
+# Letters that NFKD does not decompose, spelled the way the debate IDs do
+_TRANSLITERATE = str.maketrans({'ø': 'oe', 'æ': 'ae', 'å': 'aa', 'ð': 'd', 'þ': 'th'})
+
+
+def slugify(name: str) -> str:
+    name = unicodedata.normalize('NFKD', name.lower().translate(_TRANSLITERATE))
+    name = ''.join(c for c in name if not unicodedata.combining(c))
+
+    return re.sub(r'[^a-z0-9]+', '-', name).strip('-')
+
+
+def who_id(ref: str) -> str:
+    """Person ID of a <u who> or listPerson reference, e.g. "#FinnbogiIsakson" -> finnbogi-isakson."""
+    return slugify(re.sub(r'(?<=[^\W\d_])(?=[A-ZÆØÅÐÞÁÍÓÚÝÉ])', ' ', ref.lstrip('#')))
+
+
+def person_name(element: etree._Element) -> str:
+    """Text of a persName without its <roleName>, e.g. "Hanna Jensen"."""
+    parts = [element.text or '']
+
+    for child in element:
+        if child.tag != ROLE_NAME_TAG:
+            parts.append(etree.tostring(child, method='text', encoding='unicode', with_tail=False))
+
+        parts.append(child.tail or '')
+
+    return normalize_space(''.join(parts)).strip(' ,')
+
+
+class Person(NamedTuple):
+    id: str
+    name: str
+    # Identified by a tingdata.fo code rather than a name slug
+    coded: bool = False
+
+
+def person_id(element: etree._Element) -> Person | None:
+    """Normalized ID and name of a persName, or None if it names nobody."""
+    name = person_name(element)
+    ref = (element.get('ref') or '').strip()
+
+    if ref.startswith(TINGDATA_PERSON):
+        return Person(ref[len(TINGDATA_PERSON):].strip('/'), name, True)
+
+    slug = slugify(name)
+
+    return Person(slug, name) if slug else None
+
+
+class _Scope:
+    """People named in the header and question blocks of one TEI element."""
+
+    def __init__(self, tei: etree._Element):
+        self.bibl_authors: dict[str | None, list[Person]] = {}
+        self.authors: list[Person] = []
+
+        for bibl in SOURCE_BIBL_XPATH(tei):
+            people = [p for p in map(person_id, AUTHOR_XPATH(bibl)) if p is not None]
+            self.bibl_authors[bibl.get(XML_ID)] = people
+            self.authors += [p for p in people if p not in self.authors]
+
+        self.questioners = [p for p in map(person_id, QUESTIONER_XPATH(tei)) if p is not None]
+        self.respondents = [p for p in map(person_id, RESPONDENT_XPATH(tei)) if p is not None]
+
+
+class PersonIndex:
+
+    def __init__(self):
+        # person -> name -> occurrences
+        self.names: dict[str, Counter[str]] = defaultdict(Counter)
+        # person -> document -> roles
+        self.roles: dict[str, dict[str, set[str]]] = defaultdict(lambda: defaultdict(set))
+        # person -> document -> role -> sentence IDs
+        self.sentences: dict[str, dict[str, dict[str, list[str]]]] = defaultdict(
+            lambda: defaultdict(lambda: defaultdict(list)))
+        # Persons identified by a tingdata.fo code
+        self.coded: set[str] = set()
+        self.attributed = 0
+
+    def _add(self, person: Person, doc_path: str, role: str):
+        if person.name:
+            self.names[person.id][person.name] += 1
+
+        if person.coded:
+            self.coded.add(person.id)
+
+        self.roles[person.id][doc_path].add(role)
+
+    def add_document(self, doc: TeiDocument, doc_path: str):
+        scopes = {tei: _Scope(tei) for tei in TEI_XPATH(doc.root)}
+
+        for scope in scopes.values():
+            for person in scope.authors:
+                self._add(person, doc_path, AUTHOR)
+            for person in scope.questioners:
+                self._add(person, doc_path, QUESTIONER)
+            for person in scope.respondents:
+                self._add(person, doc_path, RESPONDENT)
+
+        for person in LIST_PERSON_XPATH(doc.root):
+            for name in PERSON_NAME_XPATH(person):
+                self.names[who_id(person.get(XML_ID))][person_name(name)] += 1
+
+        for sentence in doc.sentences:
+            if not sentence.valid:
+                continue
+
+            people, role = self._attribute(sentence.element, scopes)
+
+            if not people:
+                continue
+
+            self.attributed += 1
+
+            for person in people:
+                self._add(person, doc_path, role)
+                self.sentences[person.id][doc_path][role].append(sentence.id)
+
+    @staticmethod
+    def _attribute(element: etree._Element, scopes: dict) -> tuple[list[Person], str]:
+        role = None
+
+        for ancestor in element.iterancestors():
+            tag = ancestor.tag
+
+            if tag == U_TAG:
+                who = ancestor.get('who')
+
+                # Utterances without @who (the chair) are nobody's in particular
+                if not who:
+                    return [], SPEAKER
+
+                return [Person(who_id(ref), '') for ref in who.split()], SPEAKER
+
+            if tag == DIV_TAG and role is None:
+                div_type = ancestor.get('type')
+
+                if div_type == 'response':
+                    role = RESPONDENT
+                elif div_type in QUESTION_DIVS:
+                    role = QUESTIONER
+
+            elif tag == TEXT_TAG and ancestor.get('source'):
+                # One text per bibl in the question/answer case files
+                for scope in scopes.values():
+                    people = scope.bibl_authors.get(ancestor.get('source').lstrip('#'))
+
+                    if people is not None:
+                        return people, role or AUTHOR
+
+            elif tag == TEI_TAG:
+                scope = scopes[ancestor]
+
+                if role == QUESTIONER and scope.questioners:
+                    return scope.questioners, role
+                if role == RESPONDENT and scope.respondents:
+                    return scope.respondents, role
+
+                return scope.authors, role or AUTHOR
+
+        return [], AUTHOR
+
+    def _aliases(self) -> dict[str, str]:
+        """Uncoded person IDs mapped to the code or ID they are merged into."""
+        codes: dict[str, set[str]] = defaultdict(set)
+
+        for pid in self.coded:
+            for name in self.names.get(pid, ()):
+                codes[slugify(name)].add(pid)
+
+        aliases = {}
+
+        for pid in set(self.names) | set(self.roles):
+            if pid in self.coded:
+                continue
+
+            names = self.names.get(pid, Counter())
+            slugs = {pid} | {slugify(name) for name in names}
+            targets = {code for slug in slugs if len(codes.get(slug, ())) == 1 for code in codes[slug]}
+
+            if len(targets) == 1:
+                aliases[pid] = targets.pop()
+            elif not targets and names:
+                # The ID of the same name spelled as person_id() does, if there is one
+                slug = slugify(names.most_common(1)[0][0])
+
+                if slug != pid and (slug in self.names or slug in self.roles):
+                    aliases[pid] = slug
+
+        # An ID may be merged into one that is merged itself
+        for pid, target in aliases.items():
+            seen = {pid}
+
+            while target in aliases and target not in seen:
+                seen.add(target)
+                target = aliases[target]
+
+            aliases[pid] = target
+
+        return aliases
+
+    def save(self, path: str | Path):
+        aliases = self._aliases()
+        names: dict[str, Counter[str]] = defaultdict(Counter)
+        documents: dict[str, dict[str, dict]] = defaultdict(dict)
+
+        for pid in set(self.names) | set(self.roles):
+            target = aliases.get(pid, pid)
+            names[target].update(self.names.get(pid, {}))
+
+            for doc, roles in self.roles.get(pid, {}).items():
+                entry = documents[target].setdefault(doc, {'roles': set(), 'sentences': defaultdict(list)})
+                entry['roles'] |= roles
+
+                for role, ids in self.sentences.get(pid, {}).get(doc, {}).items():
+                    entry['sentences'][role] += ids
+
+        data = {
+            pid: {
+                'names': [name for name, _ in names[pid].most_common()],
+                'documents': {doc: {'roles': sorted(entry['roles'], key=ROLES.index),
+                                    'sentences': dict(entry['sentences'])}
+                              for doc, entry in sorted(documents[pid].items())},
+            }
+            for pid in sorted(set(names) | set(documents))
+        }
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'persons': data}, f, ensure_ascii=False)
+
+
+class PersonLookup:
+    """The saved index, with lookups per person and per sentence."""
+
+    def __init__(self, persons: dict[str, dict]):
+        self.persons = persons
+        # sentence ID -> [(person, role)]
+        self.speakers: dict[str, list[tuple[str, str]]] = defaultdict(list)
+
+        for pid, person in persons.items():
+            for entry in person['documents'].values():
+                for role, ids in entry['sentences'].items():
+                    for sentence_id in ids:
+                        self.speakers[sentence_id].append((pid, role))
+
+    @classmethod
+    def load(cls, path: str | Path) -> PersonLookup:
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f)['persons'])
+
+    def find(self, query: str) -> list[str]:
+        """Person IDs matching an ID, or a name (case-insensitive, partial)."""
+        if query in self.persons:
+            return [query]
+
+        slug = slugify(query)
+
+        return [pid for pid, person in self.persons.items()
+                if slug and (slug in pid or any(slug in slugify(name) for name in person['names']))]
+
+    def documents(self, pid: str, role: str | None = None) -> list[str]:
+        return [doc for doc, entry in self.persons[pid]['documents'].items()
+                if role is None or role in entry['roles']]
+
+    def sentences(self, pid: str, role: str | None = None) -> list[str]:
+        return [sentence_id
+                for entry in self.persons[pid]['documents'].values()
+                for sentence_role, ids in entry['sentences'].items()
+                if role is None or role == sentence_role
+                for sentence_id in ids]
+
+    def counts(self, role: str | None = None) -> dict[str, tuple[int, int]]:
+        """Documents and sentences per person."""
+        return {pid: (len(self.documents(pid, role)), len(self.sentences(pid, role)))
+                for pid in self.persons}
+
+
+def build(root: str | Path) -> PersonIndex:
+    index = PersonIndex()
+
+    for file in xml_files(root):
+        index.add_document(read_document(file), document_path(file, root))
+
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the person and speaker index.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = commands.add_parser('build', help="read the corpus and write the index")
+    build_parser.add_argument('--root', type=Path, default=Path(__file__).parent.parent,
+                              help="corpus root (default: parent of utils)")
+    build_parser.add_argument('--out', type=Path, default=DEFAULT_INDEX,
+                              help="index file (default: ../persons.json)")
+
+    list_parser = commands.add_parser('list', help="documents and sentences per person")
+    list_parser.add_argument('--role', choices=ROLES, help="only count documents with this role")
+
+    show_parser = commands.add_parser('show', help="documents (and sentences) of a person")
+    show_parser.add_argument('person', help="person ID or (part of a) name")
+    show_parser.add_argument('--role', choices=ROLES, help="only documents with this role")
+    show_parser.add_argument('--sentences', action='store_true', help="list sentence IDs as well")
+
+    for sub in (list_parser, show_parser):
+        sub.add_argument('--index', type=Path, default=DEFAULT_INDEX,
+                         help="index file (default: ../persons.json)")
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        index = build(args.root)
+        index.save(args.out)
+        print(f"Wrote {len(index.roles):,} persons and {index.attributed:,} attributed sentences to {args.out}")
+        return
+
+    if not args.index.exists():
+        print(f"Error: Index not found: {args.index} (run `persons.py build` first)")
+        sys.exit(1)
+
+    lookup = PersonLookup.load(args.index)
+
+    if args.command == 'list':
+        counts = lookup.counts(args.role)
+        rows = sorted(((pid, docs, sents) for pid, (docs, sents) in counts.items() if docs),
+                      key=lambda row: (-row[2], -row[1], row[0]))
+
+        print("| Person | Name | Documents | Sentences |")
+        print("|---|---|---:|---:|")
+
+        for pid, docs, sents in rows:
+            names = lookup.persons[pid]['names']
+            print(f"| {pid} | {names[0] if names else ''} | {docs:,} | {sents:,} |")
+        return
+
+    pids = lookup.find(args.person)
+
+    if not pids:
+        print(f"Error: No person matches '{args.person}'")
+        sys.exit(1)
+
+    for pid in pids:
+        person = lookup.persons[pid]
+        print(f"{pid}: {', '.join(person['names'])}")
+
+        for doc, entry in person['documents'].items():
+            if args.role is not None and args.role not in entry['roles']:
+                continue
+
+            count = sum(len(ids) for ids in entry['sentences'].values())
+            print(f"  {doc}  {', '.join(entry['roles'])}  ({count} sentences)")
+
+            if args.sentences:
+                for role, ids in entry['sentences'].items():
+                    print(f"    {role}: {' '.join(ids)}")
+
+
+if __name__ == '__main__':
+    main()
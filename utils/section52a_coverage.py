@@ -1,73 +1,32 @@
 #!/usr/bin/env python3
 import json
-import os
-import re
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Optional
+
+from series_coverage import load_series, scan, series_report
 
 # --- your existing pieces (kept intact) ---------------------------------------
-NUMBER_PATTERN = re.compile(r"52-(\d+)-\d+\.xml")
+# Pattern and official yearly totals (§52a) live in series.json
+SECTION_52A = next(s for s in load_series() if s.name == "52")
 
 def match_number_part(string) -> Optional[int]:
-    m = NUMBER_PATTERN.search(str(string))
-    return int(m.group(1)) if m else None
-
-# Official yearly totals (§52a)
-SECTION_52A_QUESTION_STATS: Dict[int, int] = {
-    2008: 39, 2009: 115, 2010: 85, 2011: 46, 2012: 60, 2013: 66,
-    2014: 108, 2015: 71, 2016: 100, 2017: 86, 2018: 88, 2019: 120,
-    2020: 169, 2021: 222, 2022: 135, 2023: 141, 2024: 119
-}
+    matched = SECTION_52A.match(Path(string).name)
+    return matched[1] if matched else None
 
-YEARS = list(range(2008, 2025))
+SECTION_52A_QUESTION_STATS: Dict[int, int] = SECTION_52A.official_totals
 
-def xml_files(dirpath: str):
-    # Minimal local implementation; replace with your `export_ids.xml_files` if preferred.
-    root = Path(dirpath)
-    if not root.exists():
-        return []
-    return sorted([str(p) for p in root.glob("*.xml")])
+YEARS = sorted(SECTION_52A_QUESTION_STATS)
 
 # --- stats & gaps --------------------------------------------------------------
-def per_year_counts(base_dir: str = "parliamentary-questions") -> Dict[int, int]:
-    results: Dict[int, int] = {}
-    for y in YEARS:
-        results[y] = len(list(xml_files(os.path.join(base_dir, str(y)))))
-    return results
-
-def find_gaps_for_year(year: int, base_dir: str = "parliamentary-questions") -> List[Tuple[int, int]]:
-    files = xml_files(os.path.join(base_dir, str(year)))
-    nums = sorted(filter(None, (match_number_part(f) for f in files)))
-    gaps: List[Tuple[int, int]] = []
-    if not nums:
-        return gaps
-    prev = nums[0]
-    for n in nums[1:]:
-        if n - prev > 1:
-            gaps.append((prev + 1, n - 1))
-        prev = n
-    return gaps
-
 def compute_coverage(base_dir: str = "parliamentary-questions"):
-    per_year = per_year_counts(base_dir)
-    rows = []
-    total_official = sum(SECTION_52A_QUESTION_STATS[y] for y in YEARS)
-    total_collected = 0
-    for y in YEARS:
-        collected = per_year.get(y, 0)
-        official = SECTION_52A_QUESTION_STATS[y]
-        coverage = (collected / official * 100) if official else 0.0
-        missing = max(0, official - collected)
-        total_collected += collected
-        rows.append({
-            "year": y,
-            "collected": collected,
-            "official": official,
-            "coverage_pct": round(coverage, 1),
-            "missing": missing,
-            "gaps": find_gaps_for_year(y, base_dir),
-        })
-    overall_pct = round(total_collected / total_official * 100, 1) if total_official else 0.0
+    report = series_report(SECTION_52A, scan(base_dir, [SECTION_52A])[SECTION_52A.name])
+    rows = [
+        {key: r[key] for key in ("year", "collected", "official", "coverage_pct", "missing", "gaps")}
+        for r in report["by_year"] if r["year"] in SECTION_52A_QUESTION_STATS
+    ]
+    total_collected = sum(r["collected"] for r in rows)
+    total_official = report["totals"]["official"] or 0
+    overall_pct = report["totals"]["coverage_pct"] or 0.0
     return rows, total_collected, total_official, overall_pct
 
 def render_markdown(rows, total_collected, total_official, overall_pct) -> str:
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Gap and coverage analysis for every numbered document series.
+
+The series are defined in series.json: a filename pattern with `number`
+and `year` groups and, where known, the official yearly totals. A single
+walk over the repository collects the numbers found for every series, from
+which gaps, coverage and the per-year development are computed at once.
+
+The JSON report records how many files each series/year had on the previous
+run, so repeated runs show what was added, and outputs are only rewritten
+when their content changes.
+"""
+
+import argparse
+import json
+import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+SERIES_FILE = Path(__file__).parent / 'series.json'
+
+SKIP_DIRS = {'.git', 'utils', '__pycache__'}
+
+
+@dataclass
+class Series:
+    name: str
+    description: str
+    pattern: re.Pattern
+    official_totals: dict[int, int] = field(default_factory=dict)
+
+    def match(self, filename: str) -> tuple[int, int] | None:
+        """Return (year, number) if `filename` belongs to this series."""
+        m = self.pattern.fullmatch(filename)
+        return (int(m.group('year')), int(m.group('number'))) if m else None
+
+
+def load_series(path: str | Path = SERIES_FILE) -> list[Series]:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    return [Series(name=name,
+                   description=spec.get('description', name),
+                   pattern=re.compile(spec['pattern']),
+                   official_totals={int(y): n for y, n in spec.get('official_totals', {}).items()})
+            for name, spec in data.items()]
+
+
+def scan(root: str | Path, series: list[Series]) -> dict[str, dict[int, set[int]]]:
+    """Walk `root` once and collect the numbers found per series and year."""
+    found: dict[str, dict[int, set[int]]] = {s.name: defaultdict(set) for s in series}
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+
+        for filename in filenames:
+            for s in series:
+                matched = s.match(filename)
+
+                if matched is not None:
+                    year, number = matched
+                    found[s.name][year].add(number)
+                    break
+
+    return found
+
+
+def find_gaps(numbers: set[int], upper: int | None = None) -> list[tuple[int, int]]:
+    """
+    Return the missing ranges as inclusive (first, last) pairs.
+
+    With an official total the range checked is 1..total (or the highest
+    number found, if larger); without one only holes between the lowest and
+    highest number found are reported.
+    """
+    if not numbers:
+        return [(1, upper)] if upper else []
+
+    nums = sorted(numbers)
+    start = 1 if upper is not None else nums[0]
+    end = max(upper or 0, nums[-1])
+
+    gaps: list[tuple[int, int]] = []
+    prev = start - 1
+
+    for n in nums + [end + 1]:
+        if n - prev > 1:
+            gaps.append((prev + 1, n - 1))
+        prev = n
+
+    return gaps
+
+
+def series_report(s: Series, numbers_by_year: dict[int, set[int]], previous: dict | None = None) -> dict:
+    """Coverage, gaps and per-year development for one series."""
+    previous_by_year = {r['year']: r['collected'] for r in (previous or {}).get('by_year', [])}
+
+    rows = []
+    total_collected = 0
+    total_official = 0
+    collected_with_official = 0
+
+    for year in sorted(set(numbers_by_year) | set(s.official_totals)):
+        numbers = numbers_by_year.get(year, set())
+        collected = len(numbers)
+        official = s.official_totals.get(year)
+
+        total_collected += collected
+
+        if official:
+            total_official += official
+            collected_with_official += collected
+
+        rows.append({
+            "year": year,
+            "collected": collected,
+            "official": official,
+            "coverage_pct": round(collected / official * 100, 1) if official else None,
+            "missing": max(0, official - collected) if official else None,
+            "change": collected - previous_by_year[year] if year in previous_by_year else None,
+            "gaps": find_gaps(numbers, official),
+        })
+
+    return {
+        "description": s.description,
+        "by_year": rows,
+        "totals": {
+            "collected": total_collected,
+            "official": total_official or None,
+            # Only years with an official total count towards coverage
+            "collected_with_official": collected_with_official,
+            "coverage_pct": round(collected_with_official / total_official * 100, 1) if total_official else None,
+        },
+    }
+
+
+def compute_coverage(root: str | Path, series: list[Series] | None = None, previous: dict | None = None) -> dict:
+    if series is None:
+        series = load_series()
+
+    found = scan(root, series)
+    previous_series = (previous or {}).get('series', {})
+
+    return {"series": {s.name: series_report(s, found[s.name], previous_series.get(s.name))
+                       for s in series}}
+
+
+def _format_gaps(gaps: list[tuple[int, int]]) -> str:
+    return ", ".join(str(a) if a == b else f"{a}-{b}" for a, b in gaps)
+
+
+def render_markdown(report: dict) -> str:
+    parts = []
+
+    for name, data in report['series'].items():
+        if not data['by_year']:
+            continue
+
+        lines = [
+            f"### {data['description']} (`{name}`)\n",
+            "| Year | Collected | Official total | Coverage | Missing | Change | Gaps |",
+            "|:----:|----------:|---------------:|---------:|--------:|-------:|------|",
+        ]
+
+        for r in data['by_year']:
+            official = r['official'] if r['official'] is not None else "–"
+            coverage = f"{r['coverage_pct']:.1f}%" if r['coverage_pct'] is not None else "–"
+            missing = r['missing'] if r['missing'] is not None else "–"
+            change = f"{r['change']:+d}" if r['change'] else ""
+            lines.append(f"| {r['year']} | {r['collected']} | {official} | {coverage} | {missing} | {change} | {_format_gaps(r['gaps'])} |")
+
+        totals = data['totals']
+        footer = f"\n**Totals:** Collected **{totals['collected']:,}**"
+
+        if totals['official'] and totals['collected_with_official'] != totals['collected']:
+            footer += (f" (**{totals['collected_with_official']:,}** of **{totals['official']:,}** in years"
+                       f" with an official total, overall coverage **{totals['coverage_pct']:.1f}%**)")
+        elif totals['official']:
+            footer += f" of **{totals['official']:,}** (overall coverage **{totals['coverage_pct']:.1f}%**)"
+
+        parts.append("\n".join(lines) + "\n" + footer + "\n")
+
+    return "\n".join(parts)
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    if path.exists() and path.read_text(encoding='utf-8') == content:
+        return False
+
+    path.write_text(content, encoding='utf-8')
+    return True
+
+
+def load_previous(path: Path) -> dict | None:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def main():
+    script_dir = Path(__file__).parent
+
+    parser = argparse.ArgumentParser(description="Gap and coverage analysis for numbered document series.")
+    parser.add_argument('--root', type=Path, default=script_dir.parent,
+                        help="repository root (default: parent of utils)")
+    parser.add_argument('--series', action='append', metavar='NAME',
+                        help="only report these series (repeatable, default: all)")
+    parser.add_argument('--json', type=Path, default=Path('SERIES_STATS.json'),
+                        help="JSON output (default: SERIES_STATS.json)")
+    parser.add_argument('--markdown', type=Path, default=Path('SERIES_STATS.md'),
+                        help="Markdown output (default: SERIES_STATS.md)")
+    args = parser.parse_args()
+
+    series = load_series()
+
+    if args.series:
+        series = [s for s in series if s.name in args.series]
+
+    previous = load_previous(args.json)
+    report = compute_coverage(args.root, series, previous)
+
+    write_if_changed(args.json, json.dumps(report, ensure_ascii=False, indent=2))
+    write_if_changed(args.markdown, render_markdown(report))
+
+    for name, data in report['series'].items():
+        for r in data['by_year']:
+            if r['change']:
+                print(f"[CHANGE] {name} {r['year']}: {r['change']:+d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Seekable, compressed and sharded copies of sentences.jsonl.
+
+A shard is a gzip file made of independently compressed blocks of whole
+JSONL lines, so `zcat shard.jsonl.gz` still gives plain JSONL. The first
+gzip member of every shard is empty and carries the block index in its
+header (FEXTRA subfield "TI"): per block its byte offset and compressed
+length, number of lines, lowest and highest sentence ID and year range. A
+reader only has to read that header to decide which blocks it needs and can
+decompress them on their own.
+
+Shards are bounded by --shard-size (compressed) and blocks by --block-size
+(uncompressed). `write` orders sentences by year and then ID, so most
+blocks hold a single year and --years skips the others. `get` only
+decompresses the blocks whose ID range contains the ID, usually one per
+year.
+
+    python3 shards.py write [sentences.jsonl] --out-dir ../shards
+    python3 shards.py get ../shards e5llgrwdyh
+    python3 shards.py cat ../shards --years 2010 2015 -j 4
+
+From Python, `iter_records` reads shards in parallel worker processes and
+`shard_paths(directory, worker, workers)` hands every worker a disjoint set
+of shards.
+"""
+
+from __future__ import annotations
+import argparse
+import gzip
+import json
+import struct
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, NamedTuple, TypeVar
+
+T = TypeVar('T')
+
+SHARD_PATTERN = 'sentences-{:05d}.jsonl.gz'
+SHARD_GLOB = 'sentences-*.jsonl.gz'
+
+DEFAULT_SHARD_SIZE = 4 << 20
+DEFAULT_BLOCK_SIZE = 128 << 10
+
+# Gzip header with FEXTRA set; mtime 0 and OS "unknown" keep output reproducible
+_GZIP_HEADER = b'\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff'
+# Empty deflate stream, CRC32 and ISIZE of no data
+_GZIP_EMPTY_BODY = b'\x03\x00' + bytes(8)
+_INDEX_SUBFIELD = b'TI'
+# XLEN is 16 bits and includes the 4-byte subfield header
+_MAX_INDEX_SIZE = 0xffff - 4
+# Well below that limit at about 100 bytes per index entry
+MAX_BLOCKS_PER_SHARD = 512
+
+
+class Block(NamedTuple):
+    # Byte offset in the shard file
+    offset: int
+    length: int
+    lines: int
+    min_id: str
+    max_id: str
+    min_year: int | None
+    max_year: int | None
+
+    def overlaps(self, years: tuple[int, int] | None) -> bool:
+        if years is None:
+            return True
+
+        if self.min_year is None:
+            return False
+
+        return self.min_year <= years[1] and years[0] <= self.max_year
+
+
+def shard_order(record: dict) -> tuple:
+    """Sort key for records written to shards: by year, undated last, then by ID."""
+    year = record.get('year')
+
+    return year is None, year or 0, record['id']
+
+
+def _index_member(blocks: list[Block]) -> bytes:
+    payload = json.dumps([list(block) for block in blocks], separators=(',', ':')).encode('utf-8')
+
+    if len(payload) > _MAX_INDEX_SIZE:
+        raise ValueError("block index does not fit in a gzip header; use larger blocks")
+
+    subfield = _INDEX_SUBFIELD + struct.pack('<H', len(payload)) + payload
+
+    return _GZIP_HEADER + struct.pack('<H', len(subfield)) + subfield + _GZIP_EMPTY_BODY
+
+
+def read_index(path: str | Path) -> list[Block]:
+    """Read the block index of a shard without decompressing any data."""
+    with open(path, 'rb') as f:
+        header = f.read(len(_GZIP_HEADER) + 2)
+
+        if len(header) < 12 or header[:3] != _GZIP_HEADER[:3] or not header[3] & 0x04:
+            raise ValueError(f"{path} is not a sentence shard")
+
+        (xlen,) = struct.unpack('<H', header[10:12])
+        extra = f.read(xlen)
+
+    # Offsets are stored relative to the first block, right after the index member
+    data_start = len(header) + xlen + len(_GZIP_EMPTY_BODY)
+
+    # FEXTRA may hold several subfields; find ours
+    pos = 0
+
+    while pos + 4 <= len(extra):
+        (size,) = struct.unpack('<H', extra[pos + 2:pos + 4])
+
+        if extra[pos:pos + 2] == _INDEX_SUBFIELD:
+            entries = json.loads(extra[pos + 4:pos + 4 + size])
+            return [Block(offset + data_start, *rest) for offset, *rest in entries]
+
+        pos += 4 + size
+
+    raise ValueError(f"{path} has no block index")
+
+
+class ShardWriter:
+    """
+    Write records into size-bounded shards of compressed blocks.
+
+    Records should be added in `shard_order`, so that the year and ID ranges
+    of blocks are narrow; the writer itself only tracks what it is given.
+    """
+
+    def __init__(self, out_dir: str | Path,
+                 shard_size: int = DEFAULT_SHARD_SIZE,
+                 block_size: int = DEFAULT_BLOCK_SIZE,
+                 level: int = 6):
+        self.out_dir = Path(out_dir)
+        self.shard_size = shard_size
+        self.block_size = block_size
+        self.level = level
+        self.paths: list[Path] = []
+
+        self._lines: list[bytes] = []
+        self._size = 0
+        self._ids: list[str] = []
+        self._years: list[int] = []
+
+        # Compressed blocks of the shard being filled
+        self._blocks: list[tuple[Block, bytes]] = []
+        self._shard_bytes = 0
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+
+        # Stale shards from an earlier, larger export would be read as well
+        for stale in self.out_dir.glob(SHARD_GLOB):
+            stale.unlink()
+
+    def add(self, record: dict):
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        self._lines.append(line)
+        self._size += len(line)
+        self._ids.append(record['id'])
+
+        if record.get('year') is not None:
+            self._years.append(record['year'])
+
+        if self._size >= self.block_size:
+            self._flush_block()
+
+    def _flush_block(self):
+        if not self._lines:
+            return
+
+        data = gzip.compress(b''.join(self._lines), compresslevel=self.level, mtime=0)
+
+        if self._blocks and (self._shard_bytes + len(data) > self.shard_size
+                             or len(self._blocks) >= MAX_BLOCKS_PER_SHARD):
+            self._flush_shard()
+
+        block = Block(self._shard_bytes, len(data), len(self._lines),
+                      min(self._ids), max(self._ids),
+                      min(self._years, default=None), max(self._years, default=None))
+        self._blocks.append((block, data))
+        self._shard_bytes += len(data)
+
+        self._lines, self._size, self._ids, self._years = [], 0, [], []
+
+    def _flush_shard(self):
+        if not self._blocks:
+            return
+
+        header = _index_member([block for block, _ in self._blocks])
+        path = self.out_dir / SHARD_PATTERN.format(len(self.paths))
+
+        with open(path, 'wb') as f:
+            f.write(header)
+
+            for _, data in self._blocks:
+                f.write(data)
+
+        self.paths.append(path)
+        self._blocks = []
+        self._shard_bytes = 0
+
+    def close(self):
+        self._flush_block()
+        self._flush_shard()
+
+    def __enter__(self) -> ShardWriter:
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_shards(records: Iterable[dict], out_dir: str | Path, **options) -> list[Path]:
+    """Write `records` (in `shard_order`) to shards in `out_dir` and return their paths."""
+    with ShardWriter(out_dir, **options) as writer:
+        for record in records:
+            writer.add(record)
+
+    return writer.paths
+
+
+class Shard:
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.blocks = read_index(self.path)
+
+    def __len__(self) -> int:
+        return sum(block.lines for block in self.blocks)
+
+    def read_block(self, block: Block) -> list[dict]:
+        with open(self.path, 'rb') as f:
+            f.seek(block.offset)
+            data = zlib.decompress(f.read(block.length), wbits=31)
+
+        return [json.loads(line) for line in data.splitlines()]
+
+    def records(self, years: tuple[int, int] | None = None) -> Iterator[dict]:
+        """Records of this shard, skipping blocks outside `years` (inclusive)."""
+        for block in self.blocks:
+            if not block.overlaps(years):
+                continue
+
+            for record in self.read_block(block):
+                if years is None or (record.get('year') is not None
+                                     and years[0] <= record['year'] <= years[1]):
+                    yield record
+
+    def find(self, sentence_id: str) -> dict | None:
+        for block in self.blocks:
+            if block.min_id <= sentence_id <= block.max_id:
+                for record in self.read_block(block):
+                    if record['id'] == sentence_id:
+                        return record
+
+        return None
+
+
+def shard_paths(directory: str | Path, worker: int = 0, workers: int = 1) -> list[Path]:
+    """Shards in `directory`; with `workers` > 1 only every workers-th, starting at `worker`."""
+    return sorted(Path(directory).glob(SHARD_GLOB))[worker::workers]
+
+
+def map_shards(func: Callable[[Shard], T], paths: Iterable[str | Path], jobs: int | None = None) -> Iterator[T]:
+    """Apply `func` to every shard in worker processes, yielding results in shard order."""
+    paths = list(paths)
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(partial(_apply, func), paths)
+
+
+def _apply(func: Callable[[Shard], T], path: str | Path) -> T:
+    return func(Shard(path))
+
+
+def _read_records(years: tuple[int, int] | None, shard: Shard) -> list[dict]:
+    return list(shard.records(years))
+
+
+def iter_records(directory: str | Path, years: tuple[int, int] | None = None,
+                 jobs: int | None = None) -> Iterator[dict]:
+    """All records in `directory`, decompressed in parallel, in shard order."""
+    for records in map_shards(partial(_read_records, years), shard_paths(directory), jobs):
+        yield from records
+
+
+def find(directory: str | Path, sentence_id: str) -> dict | None:
+    """Look a sentence up by ID, decompressing only blocks whose ID range contains it."""
+    # Shards are ordered by year, so any of them can hold the ID; their indexes are cheap to read
+    for path in shard_paths(directory):
+        record = Shard(path).find(sentence_id)
+
+        if record is not None:
+            return record
+
+    return None
+
+
+def main():
+    script_dir = Path(__file__).parent
+    default_dir = script_dir.parent / 'shards'
+
+    parser = argparse.ArgumentParser(description="Write and read sharded, compressed copies of sentences.jsonl.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    write_parser = commands.add_parser('write', help="shard a JSONL file")
+    write_parser.add_argument('input', nargs='?', type=Path, default=script_dir.parent / 'sentences.jsonl',
+                              help="input JSONL (default: ../sentences.jsonl)")
+    write_parser.add_argument('--out-dir', type=Path, default=default_dir,
+                              help="output directory (default: ../shards)")
+    write_parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE,
+                              help=f"maximum compressed bytes per shard (default: {DEFAULT_SHARD_SIZE})")
+    write_parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE,
+                              help=f"uncompressed bytes per block (default: {DEFAULT_BLOCK_SIZE})")
+
+    get_parser = commands.add_parser('get', help="print one sentence by ID")
+    get_parser.add_argument('directory', type=Path)
+    get_parser.add_argument('id')
+
+    cat_parser = commands.add_parser('cat', help="print all sentences as JSONL")
+    cat_parser.add_argument('directory', type=Path)
+    cat_parser.add_argument('--years', type=int, nargs=2, metavar=('FROM', 'TO'),
+                            help="only sentences from these years (inclusive)")
+    cat_parser.add_argument('--jobs', '-j', type=int, default=None,
+                            help="worker processes (default: one per CPU)")
+
+    args = parser.parse_args()
+
+    if args.command == 'write':
+        if not args.input.exists():
+            print(f"Error: Input not found: {args.input}")
+            sys.exit(1)
+
+        with open(args.input, 'r', encoding='utf-8') as f:
+            records = sorted((json.loads(line) for line in f), key=shard_order)
+
+        paths = write_shards(records, args.out_dir, shard_size=args.shard_size, block_size=args.block_size)
+        print(f"Wrote {len(records):,} sentences to {len(paths)} shards in {args.out_dir}")
+
+    elif args.command == 'get':
+        record = find(args.directory, args.id)
+
+        if record is None:
+            print(f"Error: {args.id} not found")
+            sys.exit(1)
+
+        print(json.dumps(record, ensure_ascii=False))
+
+    else:
+        years = tuple(args.years) if args.years else None
+
+        for record in iter_records(args.directory, years, args.jobs):
+            sys.stdout.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Source map from sentence IDs to their place in the TEI files.
+
+For every sentence with an ID the index records the file, the byte range of
+the element, the line it starts on, the page it starts on (the last
+preceding <pb n>) and the path of its parent element, e.g.
+`TEI/text/body/div[3]/p[2]`. It is built in the same pass as sentence
+extraction, from the parsed tree and the raw bytes of the file.
+
+With it, a sentence and its neighbours are read by seeking to their byte
+ranges and parsing only those slices, not the whole document:
+
+    python3 source_map.py build
+    python3 source_map.py show e5llgrwdyh --before 2 --after 2
+    python3 source_map.py show e5llgrwdyh --paragraph
+    python3 source_map.py show e5llgrwdyh --page
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import re
+import sys
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
+from typing import NamedTuple
+from lxml import etree
+from tei_reader import TEI_NS, TeiDocument, document_path, normalize_space, read_document, xml_files
+
+DEFAULT_INDEX = Path(__file__).parent.parent / 'source_map.json'
+
+PB_TAG = f"{{{TEI_NS}}}pb"
+TEI_TAG = f"{{{TEI_NS}}}TEI"
+
+# Start tag of an element with an xml:id; sentences are <s> or <seg type="sentence">
+_START_TAG = re.compile(rb'<(s|seg)\b[^>]*?\sxml:id="([^"]*)"')
+_TAG_PATTERNS: dict[bytes, re.Pattern] = {
+    name: re.compile(rb'<(/?)' + name + rb'\b[^>]*?(/?)>') for name in (b's', b'seg')
+}
+
+
+class Location(NamedTuple):
+    doc: str
+    start: int
+    end: int
+    line: int | None
+    page: str | None
+    path: str
+
+
+def element_end(data: bytes, start: int, name: bytes) -> int:
+    """Offset just past the element whose start tag begins at `start`."""
+    depth = 0
+
+    for m in _TAG_PATTERNS[name].finditer(data, start):
+        if m.group(1):
+            depth -= 1
+        elif not m.group(2):
+            depth += 1
+
+        # A self-closing first tag leaves the depth at 0 as well
+        if depth == 0:
+            return m.end()
+
+    raise ValueError(f"unclosed <{name.decode()}> at byte {start}")
+
+
+def _local_name(element: etree._Element) -> str:
+    return etree.QName(element).localname
+
+
+class SourceMap:
+
+    def __init__(self):
+        self.docs: list[str] = []
+        self.paths: list[str] = []
+        self._path_index: dict[str, int] = {}
+        # sentence ID -> (doc, start, end, line, page, path), as indexes into docs/paths
+        self.sentences: dict[str, tuple] = {}
+
+    def _element_path(self, element: etree._Element, cache: dict) -> str:
+        path = cache.get(element)
+
+        if path is None:
+            parent = element.getparent()
+            name = _local_name(element)
+
+            if parent is None:
+                path = name
+            else:
+                same = [sibling for sibling in parent if sibling.tag == element.tag]
+                step = f"{name}[{same.index(element) + 1}]" if len(same) > 1 else name
+                path = f"{self._element_path(parent, cache)}/{step}"
+
+            cache[element] = path
+
+        return path
+
+    def _intern(self, path: str) -> int:
+        index = self._path_index.get(path)
+
+        if index is None:
+            index = self._path_index[path] = len(self.paths)
+            self.paths.append(path)
+
+        return index
+
+    def add_document(self, doc: TeiDocument, doc_path: str):
+        with open(doc.path, 'rb') as f:
+            data = f.read()
+
+        # Byte offsets of the start tags, per ID in document order
+        starts: dict[str, list[tuple[int, bytes]]] = defaultdict(list)
+
+        for m in _START_TAG.finditer(data):
+            starts[m.group(2).decode('utf-8')].append((m.start(), m.group(1)))
+
+        # Page in effect at every sentence, in document order
+        sentence_elements = {sentence.element for sentence in doc.sentences}
+        pages: dict[etree._Element, str | None] = {}
+        page = None
+
+        for element in doc.root.iter():
+            if element.tag == TEI_TAG:
+                # Each TEI of a teiCorpus has its own pagination
+                page = None
+            elif element.tag == PB_TAG:
+                page = element.get('n', page)
+            elif element in sentence_elements:
+                pages[element] = page
+
+        doc_index = len(self.docs)
+        self.docs.append(doc_path)
+        path_cache: dict = {}
+
+        for sentence in doc.sentences:
+            if not sentence.valid or not starts.get(sentence.id):
+                continue
+
+            start, name = starts[sentence.id].pop(0)
+            parent = sentence.element.getparent()
+            path = self._element_path(parent, path_cache) if parent is not None else ''
+
+            self.sentences[sentence.id] = (doc_index, start, element_end(data, start, name),
+                                           sentence.element.sourceline, pages.get(sentence.element),
+                                           self._intern(path))
+
+    def save(self, path: str | Path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'docs': self.docs, 'paths': self.paths, 'sentences': self.sentences},
+                      f, ensure_ascii=False, separators=(',', ':'))
+
+
+class SourceLookup:
+    """The saved source map, with locations and context reads relative to `root`."""
+
+    def __init__(self, data: dict, root: str | Path):
+        self.root = Path(root)
+        self.docs: list[str] = data['docs']
+        self.paths: list[str] = data['paths']
+        self.sentences: dict[str, list] = data['sentences']
+        # doc index -> sentence IDs in file order
+        self._by_doc: dict[int, list[str]] | None = None
+
+    @classmethod
+    def load(cls, path: str | Path, root: str | Path) -> SourceLookup:
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), root)
+
+    def locate(self, sentence_id: str) -> Location | None:
+        entry = self.sentences.get(sentence_id)
+
+        if entry is None:
+            return None
+
+        doc, start, end, line, page, path = entry
+
+        return Location(self.docs[doc], start, end, line, page, self.paths[path])
+
+    def _document_order(self, doc: int) -> list[str]:
+        if self._by_doc is None:
+            by_doc = defaultdict(list)
+
+            for sentence_id, entry in self.sentences.items():
+                by_doc[entry[0]].append(sentence_id)
+
+            for ids in by_doc.values():
+                ids.sort(key=lambda i: self.sentences[i][1])
+
+            self._by_doc = dict(by_doc)
+
+        return self._by_doc.get(doc, [])
+
+    def read(self, sentence_ids: list[str]) -> list[tuple[str, str, Location]]:
+        """(ID, text, location) of sentences from one file, reading only their byte ranges."""
+        locations = [(sentence_id, self.locate(sentence_id)) for sentence_id in sentence_ids]
+
+        if not locations:
+            return []
+
+        # One read covering all slices; neighbours are close together
+        first = min(location.start for _, location in locations)
+        last = max(location.end for _, location in locations)
+
+        with open(self.root / locations[0][1].doc, 'rb') as f:
+            f.seek(first)
+            data = f.read(last - first)
+
+        return [(sentence_id, _slice_text(data[location.start - first:location.end - first]), location)
+                for sentence_id, location in locations]
+
+    def context(self, sentence_id: str, before: int = 2, after: int = 2) -> list[tuple[str, str, Location]]:
+        """The sentence with up to `before`/`after` neighbouring sentences from the same file."""
+        ids = self.neighbours(sentence_id, before, after)
+
+        return self.read(ids)
+
+    def neighbours(self, sentence_id: str, before: int = 2, after: int = 2) -> list[str]:
+        entry = self.sentences.get(sentence_id)
+
+        if entry is None:
+            return []
+
+        ordered = self._document_order(entry[0])
+        starts = [self.sentences[i][1] for i in ordered]
+        i = bisect_left(starts, entry[1])
+
+        return ordered[max(i - before, 0):i + after + 1]
+
+    def siblings(self, sentence_id: str, by: str) -> list[str]:
+        """Sentences of the same file with the same parent element (`by="path"`) or page."""
+        entry = self.sentences.get(sentence_id)
+
+        if entry is None:
+            return []
+
+        if by == 'path':
+            return [i for i in self._document_order(entry[0]) if self.sentences[i][5] == entry[5]]
+
+        # Pages are numbered per TEI, so in a teiCorpus stay within the same TEI
+        tei = _tei_path(self.paths[entry[5]])
+
+        return [i for i in self._document_order(entry[0])
+                if self.sentences[i][4] == entry[4] and _tei_path(self.paths[self.sentences[i][5]]) == tei]
+
+
+def _tei_path(path: str) -> str:
+    return path.split('/text', 1)[0]
+
+
+def _slice_text(data: bytes) -> str:
+    """Text of one sentence element cut out of its file."""
+    try:
+        element = etree.fromstring(data)
+    except etree.XMLSyntaxError:
+        # Undeclared prefixes or entities in the slice; drop the markup instead
+        return normalize_space(re.sub(r'<[^>]*>', '', data.decode('utf-8')))
+
+    return normalize_space(etree.tostring(element, method='text', encoding='unicode', with_tail=False))
+
+
+def build(root: str | Path) -> SourceMap:
+    source_map = SourceMap()
+
+    for file in xml_files(root):
+        source_map.add_document(read_document(file), document_path(file, root))
+
+    return source_map
+
+
+def main():
+    script_dir = Path(__file__).parent
+
+    parser = argparse.ArgumentParser(description="Build or query the sentence source map.")
+    parser.add_argument('--root', type=Path, default=script_dir.parent,
+                        help="corpus root (default: parent of utils)")
+    parser.add_argument('--index', type=Path, default=DEFAULT_INDEX,
+                        help="index file (default: ../source_map.json)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('build', help="read the corpus and write the index")
+
+    show_parser = commands.add_parser('show', help="print a sentence with its location and context")
+    show_parser.add_argument('id')
+    show_parser.add_argument('--before', type=int, default=0, help="sentences before (default: 0)")
+    show_parser.add_argument('--after', type=int, default=0, help="sentences after (default: 0)")
+    scope = show_parser.add_mutually_exclusive_group()
+    scope.add_argument('--paragraph', action='store_true', help="all sentences with the same parent element")
+    scope.add_argument('--page', action='store_true', help="all sentences on the same page")
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        source_map = build(args.root)
+        source_map.save(args.index)
+        print(f"Wrote {len(source_map.sentences):,} sentence locations to {args.index}")
+        return
+
+    if not args.index.exists():
+        print(f"Error: Index not found: {args.index} (run `source_map.py build` first)")
+        sys.exit(1)
+
+    lookup = SourceLookup.load(args.index, args.root)
+    location = lookup.locate(args.id)
+
+    if location is None:
+        print(f"Error: {args.id} not found")
+        sys.exit(1)
+
+    print(f"{location.doc}:{location.line}  bytes {location.start}-{location.end}  "
+          f"page {location.page or '-'}  {location.path}")
+
+    if args.paragraph or args.page:
+        ids = lookup.siblings(args.id, 'path' if args.paragraph else 'page')
+    else:
+        ids = lookup.neighbours(args.id, args.before, args.after)
+
+    for sentence_id, text, _ in lookup.read(ids):
+        marker = '>' if sentence_id == args.id else ' '
+        print(f"{marker} {sentence_id}  {text}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Deterministic train/dev/test splits and stratified samples of sentences.jsonl.
+
+Each sentence is assigned to a split by a stable hash of its `id`, or of
+its `doc` with --group-by doc so that all sentences from one document end up
+in the same split. The assignment depends only on the key and the seed, not
+on the order or size of the input, so a sentence keeps its split when the
+dataset is regenerated.
+
+Samples use a hash salted differently from the split's: the N sentences
+with the smallest sample hash are kept (per year or category with
+--stratify), which behaves like reservoir sampling but is reproducible and
+independent of input order, and draws from all splits alike.
+
+Everything happens in a single streaming pass; memory is bounded by the
+sample size, not by the size of the input.
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+SPLITS = ('train', 'dev', 'test')
+
+DEFAULT_SEED = 'tingmal'
+
+# Appended to the seed for sampling, so the sample does not follow the split
+SAMPLE_SALT = '\x00sample'
+
+
+def stable_hash(key: str, seed: str = DEFAULT_SEED) -> float:
+    """Map `key` to [0, 1) independently of PYTHONHASHSEED and platform."""
+    digest = hashlib.blake2b(f"{seed}\x00{key}".encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') / 2**64
+
+
+def assign_split(key: str, ratios: tuple[float, ...], seed: str = DEFAULT_SEED) -> str:
+    h = stable_hash(key, seed)
+    cumulative = 0.0
+
+    for name, ratio in zip(SPLITS, ratios):
+        cumulative += ratio
+
+        if h < cumulative:
+            return name
+
+    # Rounding in the ratios can leave a sliver at the top
+    return SPLITS[len(ratios) - 1]
+
+
+def split_key(obj: dict, group_by: str) -> str:
+    if group_by == 'doc':
+        # Older exports have no `doc`; fall back to the sentence itself
+        return obj.get('doc') or obj['id']
+
+    return obj['id']
+
+
+def stratum(obj: dict, stratify: str | None) -> str:
+    if stratify is None:
+        return 'all'
+
+    value = obj.get(stratify)
+
+    return 'unknown' if value is None else str(value)
+
+
+def run(input_path: Path,
+        out_dir: Path,
+        ratios: tuple[float, ...] = (0.8, 0.1, 0.1),
+        seed: str = DEFAULT_SEED,
+        group_by: str = 'id',
+        write_splits: bool = True,
+        sample_size: int | None = None,
+        stratify: str | None = None) -> dict:
+    """
+    Stream `input_path` once, writing <split>.jsonl and/or sample.jsonl to
+    `out_dir`. Returns the number of sentences per split and stratum.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    counts: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    outputs = {}
+
+    # Per stratum a max-heap (negated hash) of the `sample_size` smallest hashes
+    samples: dict[str, list[tuple[float, int, str]]] = defaultdict(list)
+
+    try:
+        if write_splits:
+            for name in SPLITS[:len(ratios)]:
+                outputs[name] = open(out_dir / f"{name}.jsonl", 'w', encoding='utf-8')
+
+        with open(input_path, 'r', encoding='utf-8') as f:
+            for n, line in enumerate(f):
+                obj = json.loads(line)
+                key = split_key(obj, group_by)
+                group = stratum(obj, stratify)
+
+                split = assign_split(key, ratios, seed)
+                counts[split][group] += 1
+
+                if write_splits:
+                    outputs[split].write(line)
+
+                if sample_size:
+                    # Sample individual sentences, not whole documents
+                    item = (-stable_hash(obj['id'], seed + SAMPLE_SALT), n, line)
+                    heap = samples[group]
+
+                    if len(heap) < sample_size:
+                        heapq.heappush(heap, item)
+                    elif item > heap[0]:
+                        heapq.heapreplace(heap, item)
+    finally:
+        for output in outputs.values():
+            output.close()
+
+    if sample_size:
+        with open(out_dir / 'sample.jsonl', 'w', encoding='utf-8') as f:
+            for group in sorted(samples):
+                # Keep input order within a stratum
+                for _, _, line in sorted(samples[group], key=lambda item: item[1]):
+                    f.write(line)
+
+    return {split: dict(groups) for split, groups in counts.items()}
+
+
+def main():
+    script_dir = Path(__file__).parent
+
+    parser = argparse.ArgumentParser(description="Deterministic splits and stratified samples of sentences.jsonl.")
+    parser.add_argument('input', nargs='?', type=Path, default=script_dir.parent / 'sentences.jsonl',
+                        help="input JSONL (default: ../sentences.jsonl)")
+    parser.add_argument('--out-dir', type=Path, default=Path('splits'),
+                        help="output directory (default: splits)")
+    parser.add_argument('--ratios', type=float, nargs='+', default=[0.8, 0.1, 0.1],
+                        help="train/dev/test ratios (default: 0.8 0.1 0.1)")
+    parser.add_argument('--seed', default=DEFAULT_SEED,
+                        help=f"hash seed; change it to draw a different split (default: {DEFAULT_SEED})")
+    parser.add_argument('--group-by', choices=('id', 'doc'), default='id',
+                        help="assign splits per sentence or per source document (default: id)")
+    parser.add_argument('--sample', type=int, metavar='N',
+                        help="also write sample.jsonl with N sentences (per stratum with --stratify)")
+    parser.add_argument('--stratify', choices=('year', 'category'),
+                        help="sample N sentences per year or per document category")
+    parser.add_argument('--no-splits', action='store_true',
+                        help="only write the sample")
+    args = parser.parse_args()
+
+    ratios = tuple(args.ratios)
+
+    if not 1 <= len(ratios) <= len(SPLITS) or abs(sum(ratios) - 1.0) > 1e-6:
+        parser.error(f"--ratios takes 1 to {len(SPLITS)} values that sum to 1")
+
+    if args.sample is not None and args.sample < 1:
+        parser.error("--sample must be at least 1")
+
+    if args.sample is None and (args.stratify or args.no_splits):
+        parser.error(f"{'--stratify' if args.stratify else '--no-splits'} requires --sample")
+
+    if not args.input.exists():
+        print(f"Error: Input not found: {args.input}")
+        sys.exit(1)
+
+    counts = run(args.input, args.out_dir,
+                 ratios=ratios,
+                 seed=args.seed,
+                 group_by=args.group_by,
+                 write_splits=not args.no_splits,
+                 sample_size=args.sample,
+                 stratify=args.stratify)
+
+    if args.no_splits:
+        return
+
+    total = sum(sum(groups.values()) for groups in counts.values())
+
+    for split in SPLITS:
+        if split in counts:
+            n = sum(counts[split].values())
+            print(f"{split}: {n:,} ({n / total * 100:.1f}%)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+# MIT License
+#
+# Copyright (c) 2025 Rani Høgnason Hansen
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""
+Shared reader layer for the TEI files in the corpus.
+
+Parsers are reused per thread, the XPath queries are compiled once at import
+time and files are parsed straight from disk. `read_document` parses a file
+once and returns its IDs, sentences and header fields together, so the
+utilities in this directory no longer need to parse the same file twice.
+"""
+
+from __future__ import annotations
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Final, Iterator, NamedTuple
+from lxml import etree
+
+# TEI namespace
+TEI_NS: Final[str] = "http://www.tei-c.org/ns/1.0"
+XML_NS: Final[str] = "http://www.w3.org/XML/1998/namespace"
+NAMESPACES: Final[dict[str, str]] = {
+    'tei': TEI_NS,
+    'xml': XML_NS
+}
+
+XML_ID: Final[str] = f"{{{XML_NS}}}id"
+XML_LANG: Final[str] = f"{{{XML_NS}}}lang"
+TEI_DIV: Final[str] = f"{{{TEI_NS}}}div"
+
+# Length of the base32 sentence IDs produced by id_utils.generate_b32_id
+ID_LENGTH: Final[int] = 10
+
+# Precompiled queries
+SENTENCE_XPATH = etree.XPath('//tei:s | //tei:seg[@type="sentence"]', namespaces=NAMESPACES)
+ID_VALUE_XPATH = etree.XPath(f'//@xml:id[string-length() = {ID_LENGTH}]',
+                             namespaces=NAMESPACES, smart_strings=False)
+# First date without type attribute from sourceDesc
+SOURCE_DATE_XPATH = etree.XPath('(//tei:sourceDesc//tei:date[@when and not(@type)])[1]/@when',
+                                namespaces=NAMESPACES, smart_strings=False)
+BIBL_XPATH = etree.XPath('//tei:teiHeader/tei:fileDesc/tei:sourceDesc/tei:bibl', namespaces=NAMESPACES)
+UNTYPED_DATE_XPATH = etree.XPath('tei:date[not(@type)]', namespaces=NAMESPACES)
+NOTE_XPATH = etree.XPath('tei:note', namespaces=NAMESPACES)
+SIGNATURE_DATE_XPATH = etree.XPath('//tei:div[@type="signature"]//tei:date', namespaces=NAMESPACES)
+
+_local = threading.local()
+
+
+def get_parser() -> etree.XMLParser:
+    """
+    Return this thread's parser, creating it on first use.
+
+    lxml parsers are not safe to share between threads, but are cheap to
+    reuse within one.
+    """
+    parser = getattr(_local, 'parser', None)
+
+    if parser is None:
+        # Parse with a parser that preserves whitespace
+        parser = etree.XMLParser(remove_blank_text=False,
+                                 remove_comments=False,
+                                 strip_cdata=False)
+        _local.parser = parser
+
+    return parser
+
+
+def xml_files(root: str | Path) -> Iterator[Path]:
+    root = Path(root)
+    for p in root.rglob("*"):
+        # robust across case-sensitive (Linux) and case-insensitive (macOS) filesystems
+        if p.is_file() and p.suffix.lower() == ".xml":
+            yield p
+
+
+def document_path(filepath: str | Path, root: str | Path) -> str:
+    """Path of a file relative to the corpus root, e.g. "proposals/2019/lm-051-2019.xml"."""
+    return Path(filepath).relative_to(root).as_posix()
+
+
+def document_category(doc: str) -> str:
+    """Top-level directory of a document path, e.g. "proposals"."""
+    return doc.split('/', 1)[0]
+
+
+def parse_file(filepath: str | Path) -> etree._Element:
+    """Parse a file directly from disk and return its root element."""
+    return etree.parse(os.fspath(filepath), get_parser()).getroot()
+
+
+def write_file(root: etree._Element, filepath: str | Path) -> None:
+    """Write a tree back with minimal changes."""
+    result = etree.tostring(root,
+                            encoding='unicode',
+                            pretty_print=False,
+                            method='xml')
+
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(result)
+
+
+def normalize_space(text: str) -> str:
+    return " ".join(text.strip().split())
+
+
+def year_from_date(when: str | None) -> int | None:
+    """Extract the year from a date (e.g., "2025-09-03" -> 2025)."""
+    if when is None or len(when) < 4:
+        return None
+
+    try:
+        return int(when[:4])
+    except ValueError:
+        return None
+
+
+class Sentence(NamedTuple):
+    id: str | None
+    lang: str | None
+    cert: str | None
+    element: etree._Element
+
+    @property
+    def text(self) -> str:
+        # Same result as the XPath string() of the element, without the
+        # XPath evaluation overhead
+        return normalize_space(etree.tostring(self.element, method='text',
+                                              encoding='unicode', with_tail=False))
+
+    @property
+    def language(self) -> str | None:
+        """Own or inherited xml:lang."""
+        if self.lang is not None:
+            return self.lang
+
+        for ancestor in self.element.iterancestors():
+            lang = ancestor.get(XML_LANG)
+
+            if lang is not None:
+                return lang
+
+        return None
+
+    @property
+    def division(self) -> str | None:
+        """Type of the nearest enclosing <div type>, e.g. "background"."""
+        for ancestor in self.element.iterancestors(TEI_DIV):
+            div_type = ancestor.get('type')
+
+            if div_type is not None:
+                return div_type
+
+        return None
+
+    @property
+    def valid(self) -> bool:
+        """Has a sentence ID and is not marked as low certainty."""
+        if self.cert is not None and self.cert.lower() == 'low':
+            return False
+
+        return self.id is not None and len(self.id) == ID_LENGTH
+
+    @property
+    def extractable(self) -> bool:
+        """True for sentences that belong in sentences.jsonl."""
+        return self.valid and self.lang != 'da'
+
+
+@dataclass
+class TeiDocument:
+    path: Path
+    root: etree._Element
+    source_date: str | None = None
+    year: int | None = None
+    ids: list[str] = field(default_factory=list)
+    sentences: list[Sentence] = field(default_factory=list)
+
+
+def read_document(filepath: str | Path) -> TeiDocument:
+    """
+    Parse a file once and collect its header date, IDs and sentences.
+
+    `ids` holds every ten character xml:id in the file, `sentences` every
+    <s> and <seg type="sentence"> whether it has an ID or not. Each query
+    runs in C over the already parsed tree, which is cheaper than visiting
+    every element from Python.
+    """
+    root = parse_file(filepath)
+
+    dates = SOURCE_DATE_XPATH(root)
+    source_date = dates[0] if dates else None
+
+    sentences = [Sentence(element.get(XML_ID),
+                          element.get(XML_LANG),
+                          element.get('cert'),
+                          element)
+                 for element in SENTENCE_XPATH(root)]
+
+    return TeiDocument(path=Path(filepath),
+                       root=root,
+                       source_date=source_date,
+                       year=year_from_date(source_date),
+                       ids=ID_VALUE_XPATH(root),
+                       sentences=sentences)
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Validate ID integrity and header consistency across the whole corpus.
+
+Reports every violation as `path:line: code: message` and exits non-zero if
+any were found, so it can run as a pre-commit hook. Files are checked in
+parallel and the per-file results are cached by size and modification time,
+so only files that changed since the last run are parsed again.
+
+Checks:
+  parse-error     the file is not well-formed XML
+  missing-id      a sentence has no xml:id (export_ids.py skips it)
+  malformed-id    a sentence ID is not a 10-char base32 ID starting with a letter
+  duplicate-id    a sentence ID, or any other 10-char xml:id, is used more than once
+  missing-date    no <date when> without @type in sourceDesc (year becomes None)
+  invalid-date    the sourceDesc date does not start with a year
+  missing-lang    a sentence has no xml:lang, neither its own nor inherited
+  inherited-lang  a sentence inherits a non-Faroese xml:lang (export_ids.py keeps it)
+
+Known violations can be recorded in a baseline file with --update-baseline;
+runs with --baseline then only report violations that are not in it, so the
+check can gate new commits before the existing ones are fixed.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from lxml import etree
+from id_utils import ALPHABET
+from tei_reader import NAMESPACES, BIBL_XPATH, ID_LENGTH, XML_ID, read_document, xml_files
+
+# Bump when the checks change so stale cache entries are discarded
+CACHE_VERSION = 2
+
+DEFAULT_CACHE = Path(__file__).parent / '.validate_cache.json'
+
+CODES = ('parse-error', 'missing-id', 'malformed-id', 'duplicate-id',
+         'missing-date', 'invalid-date', 'missing-lang', 'inherited-lang')
+
+ID_PATTERN = re.compile(f"[{ALPHABET[:26]}][{ALPHABET}]{{{ID_LENGTH - 1}}}\\Z")
+
+MISSING_LANG_XPATH = etree.XPath(
+    '(//tei:s | //tei:seg[@type="sentence"])[not(ancestor-or-self::*[@xml:lang])]',
+    namespaces=NAMESPACES
+)
+# Elements with an ID of the generated length; export_ids.py treats all of them as used
+ID_ELEMENT_XPATH = etree.XPath(f'//*[string-length(@xml:id) = {ID_LENGTH}]', namespaces=NAMESPACES)
+SOURCE_DATE_ELEMENT_XPATH = etree.XPath('(//tei:sourceDesc//tei:date[@when and not(@type)])[1]',
+                                        namespaces=NAMESPACES)
+INHERITED_LANG_XPATH = etree.XPath(
+    '(//tei:s | //tei:seg[@type="sentence"])[not(@xml:lang)]'
+    '[ancestor::*[@xml:lang][1]/@xml:lang != "fo"]',
+    namespaces=NAMESPACES
+)
+
+
+def check_file(filepath: Path) -> tuple[list[tuple[int, str, str]], list[tuple[str, int]]]:
+    """
+    Run the per-file checks.
+
+    Returns the violations as (line, code, message) and the sentence and
+    other element IDs as (id, line); duplicates are found afterwards across
+    all files.
+    """
+    violations = []
+    ids = []
+
+    try:
+        doc = read_document(filepath)
+    except etree.XMLSyntaxError as e:
+        return [(e.lineno or 0, 'parse-error', str(e))], []
+
+    root = doc.root
+
+    if doc.source_date is None:
+        bibl_elements = BIBL_XPATH(root)
+        line = bibl_elements[0].sourceline if bibl_elements else root.sourceline
+        violations.append((line, 'missing-date', "no <date when> without @type in sourceDesc"))
+    elif doc.year is None:
+        violations.append((SOURCE_DATE_ELEMENT_XPATH(root)[0].sourceline, 'invalid-date',
+                           f"sourceDesc date '{doc.source_date}' has no year"))
+
+    for sentence in doc.sentences:
+        line = sentence.element.sourceline
+
+        if sentence.id is None:
+            violations.append((line, 'missing-id', "sentence has no xml:id"))
+            continue
+
+        if not ID_PATTERN.match(sentence.id):
+            violations.append((line, 'malformed-id', f"'{sentence.id}' is not a {ID_LENGTH}-char base32 ID"))
+
+        ids.append((sentence.id, line))
+
+    # IDs on other elements (<p>, <u>, <div>, ...) share the registry with sentence IDs
+    sentence_elements = {sentence.element for sentence in doc.sentences}
+
+    for element in ID_ELEMENT_XPATH(root):
+        if element not in sentence_elements:
+            ids.append((element.get(XML_ID), element.sourceline))
+
+    for element in MISSING_LANG_XPATH(root):
+        violations.append((element.sourceline, 'missing-lang', "sentence has no xml:lang"))
+
+    for element in INHERITED_LANG_XPATH(root):
+        lang = element.xpath('ancestor::*[@xml:lang][1]/@xml:lang', namespaces=NAMESPACES)[0]
+        violations.append((element.sourceline, 'inherited-lang',
+                           f"sentence inherits xml:lang '{lang}' but is extracted as Faroese"))
+
+    return violations, ids
+
+
+def _check(args: tuple[str, str]) -> tuple[str, dict]:
+    relpath, filepath = args
+    violations, ids = check_file(Path(filepath))
+
+    return relpath, {'violations': violations, 'ids': ids}
+
+
+def load_cache(cache_path: Path) -> dict:
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if cache.get('version') != CACHE_VERSION:
+        return {}
+
+    return cache.get('files', {})
+
+
+def save_cache(cache_path: Path, files: dict):
+    tmp_path = cache_path.with_suffix('.tmp')
+
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'files': files}, f, ensure_ascii=False)
+
+    os.replace(tmp_path, cache_path)
+
+
+def load_baseline(baseline_path: Path) -> Counter:
+    """Known violations as (path, code, message) counts, without line numbers so edits do not shift them."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    return Counter({(relpath, *entry.split(': ', 1)): count
+                    for relpath, entries in data.items() for entry, count in entries.items()})
+
+
+def save_baseline(baseline_path: Path, violations: list[tuple[str, int, str, str]]):
+    # Per file, "code: message" -> count; tens of thousands of missing-lang collapse to one entry per file
+    data: dict[str, Counter] = {}
+
+    for relpath, _, code, message in violations:
+        data.setdefault(relpath, Counter())[f"{code}: {message}"] += 1
+
+    with open(baseline_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+        f.write('\n')
+
+
+def new_violations(violations: list[tuple[str, int, str, str]], baseline: Counter) -> list[tuple[str, int, str, str]]:
+    """Violations not accounted for by the baseline."""
+    remaining = Counter(baseline)
+    new = []
+
+    for violation in violations:
+        key = (violation[0], violation[2], violation[3])
+
+        if remaining[key] > 0:
+            remaining[key] -= 1
+        else:
+            new.append(violation)
+
+    return new
+
+
+def validate(root: Path, cache_path: Path | None = None, jobs: int | None = None) -> list[tuple[str, int, str, str]]:
+    """Validate every XML file under `root` and return the sorted violations."""
+    cached = load_cache(cache_path) if cache_path is not None else {}
+
+    results = {}
+    pending = []
+
+    for filepath in xml_files(root):
+        relpath = filepath.relative_to(root).as_posix()
+        stat = filepath.stat()
+        entry = cached.get(relpath)
+
+        if entry is not None and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            results[relpath] = entry
+        else:
+            pending.append((relpath, str(filepath), stat))
+
+    if pending:
+        work = [(relpath, filepath) for relpath, filepath, _ in pending]
+
+        if jobs == 1 or len(pending) == 1:
+            checked = list(map(_check, work))
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                checked = list(executor.map(_check, work, chunksize=16))
+
+        stats = {relpath: stat for relpath, _, stat in pending}
+
+        for relpath, entry in checked:
+            entry['mtime_ns'] = stats[relpath].st_mtime_ns
+            entry['size'] = stats[relpath].st_size
+            results[relpath] = entry
+
+        if cache_path is not None:
+            save_cache(cache_path, results)
+
+    violations = []
+    first_seen = {}
+
+    for relpath in sorted(results):
+        entry = results[relpath]
+
+        for line, code, message in entry['violations']:
+            violations.append((relpath, line, code, message))
+
+        for found_id, line in entry['ids']:
+            if found_id in first_seen:
+                first_path, first_line = first_seen[found_id]
+                violations.append((relpath, line, 'duplicate-id',
+                                   f"'{found_id}' already used at {first_path}:{first_line}"))
+            else:
+                first_seen[found_id] = (relpath, line)
+
+    violations.sort(key=lambda v: (v[0], v[1] or 0, v[2]))
+
+    return violations
+
+
+def main():
+    script_dir = Path(__file__).parent
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('root', nargs='?', default=script_dir.parent, type=Path,
+                        help="corpus root (default: the repository root)")
+    parser.add_argument('--ignore', action='append', default=[], metavar='CODE', choices=CODES,
+                        help="skip a check, e.g. --ignore missing-lang (repeatable)")
+    parser.add_argument('--baseline', type=Path, metavar='FILE',
+                        help="only report violations that are not recorded in this file")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="record the current violations in the --baseline file and exit")
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="check every file and do not read or write the cache")
+    parser.add_argument('--cache', type=Path, default=DEFAULT_CACHE,
+                        help=f"cache file (default: {DEFAULT_CACHE.name} next to this script)")
+    parser.add_argument('--quiet', '-q', action='store_true',
+                        help="only print the summary")
+    args = parser.parse_args()
+
+    if args.update_baseline and args.baseline is None:
+        parser.error("--update-baseline requires --baseline")
+
+    if not args.root.exists():
+        print(f"Error: Corpus root not found: {args.root}")
+        sys.exit(2)
+
+    violations = validate(args.root.resolve(),
+                          cache_path=None if args.no_cache else args.cache,
+                          jobs=args.jobs)
+
+    ignored = set(args.ignore)
+    violations = [v for v in violations if v[2] not in ignored]
+
+    if args.update_baseline:
+        save_baseline(args.baseline, violations)
+        print(f"Recorded {len(violations):,} violation(s) in {args.baseline}")
+        return
+
+    if args.baseline is not None:
+        if not args.baseline.exists():
+            print(f"Error: Baseline not found: {args.baseline}")
+            sys.exit(2)
+
+        violations = new_violations(violations, load_baseline(args.baseline))
+
+    counts = {}
+
+    for relpath, line, code, message in violations:
+        counts[code] = counts.get(code, 0) + 1
+
+        if not args.quiet:
+            print(f"{relpath}:{line}: {code}: {message}")
+
+    if violations:
+        summary = ", ".join(f"{code}: {count:,}" for code, count in sorted(counts.items()))
+        print(f"\n{len(violations):,} violation(s) ({summary})")
+        sys.exit(1)
+
+    print("No violations found")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Cross-reference graph between questions, proposals, acts and orders.
+
+References are recognised in sentence text while the corpus is read
+("spurning 52-133/2023", "løgtingsmál nr. 82/2014", "kunngerð nr. 76 frá
+3. mai 2005", ...) and in the headers (case-number <idno>, <ref target>,
+@corresp). Each reference becomes a key such as `52:133/2023` or
+`kunngerd:76/2005`, named after the series in series.json, and is resolved
+to the corpus file of that series, number and year where one exists.
+
+The index stores the references in both directions: per document the keys
+it cites with the citing sentence IDs (null for header references), per
+key the documents and sentences citing it, and per sentence ID the keys it
+cites. Multi-hop queries walk that graph in memory:
+
+    python3 xrefs.py build
+    python3 xrefs.py query 52-133/2023 --backward --hops 3   # follow-ups
+    python3 xrefs.py query proposals/2019/lm-079-2019.xml    # what it cites
+    python3 xrefs.py query pk2fpgyprd                        # one sentence
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import re
+import sys
+from collections import defaultdict, deque
+from pathlib import Path
+from lxml import etree
+from series_coverage import Series, load_series
+from tei_reader import NAMESPACES, TeiDocument, document_path, read_document, xml_files
+
+DEFAULT_INDEX = Path(__file__).parent.parent / 'xrefs.json'
+
+# Number and year of a reference, "nr. 12/2011" or "nr. 62 frá 17. mai 2005"
+_NUMBER = r'(?:\s*nr\.?)?[\s-]*(?P<number>\d{1,4})'
+_YEAR = r'(?:/|\s+frá\s+(?:\d{1,2}\.\s*\w+\s+)?)(?P<year>\d{4})\b'
+
+# (series, pattern) in order of precedence; "question" is 52 or ss by year
+REFERENCE_PATTERNS: list[tuple[str, re.Pattern]] = [
+    (series, re.compile(pattern, re.IGNORECASE)) for series, pattern in [
+        ('52', r'tingdata\.fo/52a-fyrispurningur/(?P<year>\d{4})/(?P<number>\d+)'),
+        ('52', r'\b52-(?P<number>\d{1,4})/(?P<year>\d{4})\b'),
+        ('question', r'\bfyrispurning\w*' + _NUMBER + r'/(?P<year>\d{4})\b'),
+        ('lm', r'\b(?:lm\.?|løgtings?mál\w*|tingmál\w*)' + _NUMBER + r'[/-](?P<year>\d{4})\b'),
+        ('fg', r'\bfrágreiðing\w*' + _NUMBER + r'/(?P<year>\d{4})\b'),
+        ('loegtingslogarkunngerd', r'\bløgtingslógarkunngerð\w*' + _NUMBER + _YEAR),
+        ('loegtingslog', r'\bløgtingslóg(?!arkunngerð)\w*' + _NUMBER + _YEAR),
+        ('kunngerd', r'\bkunngerð\w*' + _NUMBER + _YEAR),
+    ]
+]
+
+# Questions were numbered under § 52a from 2008, in the ss series before
+QUESTION_SERIES_FROM = 2008
+
+HEADER_REF_XPATH = etree.XPath(
+    '//tei:teiHeader//tei:idno[@type="case-number"]/text()'
+    ' | //tei:teiHeader//tei:ref/@target'
+    ' | //@corresp',
+    namespaces=NAMESPACES, smart_strings=False)
+
+
+def find_references(text: str) -> list[str]:
+    """Reference keys in `text`, in order of appearance and without duplicates."""
+    found: dict[str, int] = {}
+    # Spans already claimed, so "løgtingsmál nr. 52-1/2010" is not also a question
+    taken: list[tuple[int, int]] = []
+
+    for series, pattern in REFERENCE_PATTERNS:
+        for m in pattern.finditer(text):
+            if any(start < m.end() and m.start() < end for start, end in taken):
+                continue
+
+            year, number = int(m.group('year')), int(m.group('number'))
+            key_series = series
+
+            if series == 'question':
+                key_series = '52' if year >= QUESTION_SERIES_FROM else 'ss'
+
+            taken.append(m.span())
+            found.setdefault(f"{key_series}:{number}/{year}", m.start())
+
+    return sorted(found, key=found.get)
+
+
+def document_key(filename: str, series: list[Series]) -> str | None:
+    for s in series:
+        matched = s.match(filename)
+
+        if matched is not None:
+            year, number = matched
+            return f"{s.name}:{number}/{year}"
+
+    return None
+
+
+class XrefIndex:
+
+    def __init__(self, series: list[Series] | None = None):
+        self.series = series if series is not None else load_series()
+        # key -> corpus document
+        self.documents: dict[str, str] = {}
+        # document -> key -> citing sentence IDs (None for the header)
+        self.forward: dict[str, dict[str, list[str | None]]] = defaultdict(lambda: defaultdict(list))
+        # key -> document -> citing sentence IDs
+        self.backward: dict[str, dict[str, list[str | None]]] = defaultdict(lambda: defaultdict(list))
+        # sentence ID -> keys
+        self.sentences: dict[str, list[str]] = {}
+
+    def add_document(self, doc: TeiDocument, doc_path: str):
+        own_key = document_key(Path(doc_path).name, self.series)
+
+        if own_key is not None:
+            self.documents[own_key] = doc_path
+
+        for value in HEADER_REF_XPATH(doc.root):
+            for key in find_references(value):
+                self._add(doc_path, own_key, key, None)
+
+        for sentence in doc.sentences:
+            if not sentence.valid:
+                continue
+
+            text = sentence.text
+
+            # Every pattern needs a number; most sentences have none
+            if not any(c.isdigit() for c in text):
+                continue
+
+            keys = [key for key in find_references(text) if key != own_key]
+
+            if keys:
+                self.sentences[sentence.id] = keys
+
+                for key in keys:
+                    self._add(doc_path, own_key, key, sentence.id)
+
+    def _add(self, doc_path: str, own_key: str | None, key: str, sentence_id: str | None):
+        # A document naming itself, e.g. its own @corresp, is not a link
+        if key == own_key:
+            return
+
+        citing = self.forward[doc_path][key]
+
+        if sentence_id not in citing:
+            citing.append(sentence_id)
+            self.backward[key][doc_path].append(sentence_id)
+
+    def node(self, key: str) -> str:
+        """The corpus document for `key`, or the key itself if not in the corpus."""
+        return self.documents.get(key, key)
+
+    def resolve(self, target: str) -> str | None:
+        """Map a document path, key, reference text or filename to a graph node."""
+        if target in self.forward or target in self.documents.values():
+            return target
+
+        if target in self.documents or target in self.backward:
+            return self.node(target)
+
+        key = document_key(Path(target).name, self.series)
+        keys = [key] if key is not None else find_references(target)
+
+        return self.node(keys[0]) if keys else None
+
+    def references(self, node: str, hops: int | None = 1) -> dict[str, tuple[int, list[str | None]]]:
+        """Nodes reachable from `node` within `hops` (None: any number)."""
+        return self._walk(node, hops, lambda n: ((self.node(key), ids)
+                                                 for key, ids in self.forward.get(n, {}).items()))
+
+    def referenced_by(self, node: str, hops: int | None = 1) -> dict[str, tuple[int, list[str | None]]]:
+        """Documents that reach `node` within `hops` (None: any number)."""
+        doc_keys: dict[str, list[str]] = defaultdict(list)
+
+        for key, path in self.documents.items():
+            doc_keys[path].append(key)
+
+        return self._walk(node, hops, lambda n: ((source, ids)
+                                                 for key in doc_keys.get(n, [n])
+                                                 for source, ids in self.backward.get(key, {}).items()))
+
+    def _walk(self, start: str, hops: int | None, neighbours) -> dict[str, tuple[int, list[str | None]]]:
+        # Breadth-first, so every node is reported at its shortest distance
+        seen: dict[str, tuple[int, list[str | None]]] = {}
+        queue = deque([(start, 0)])
+
+        while queue:
+            current, depth = queue.popleft()
+
+            if hops is not None and depth >= hops:
+                continue
+
+            for node, ids in neighbours(current):
+                if node == start or node in seen:
+                    continue
+
+                seen[node] = (depth + 1, ids)
+                queue.append((node, depth + 1))
+
+        return seen
+
+    def save(self, path: str | Path):
+        data = {
+            'documents': dict(sorted(self.documents.items())),
+            'forward': {doc: dict(keys) for doc, keys in sorted(self.forward.items())},
+            'backward': {key: dict(docs) for key, docs in sorted(self.backward.items())},
+            'sentences': self.sentences,
+        }
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str | Path) -> XrefIndex:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        index = cls()
+        index.documents = data['documents']
+        index.forward = data['forward']
+        index.backward = data['backward']
+        index.sentences = data['sentences']
+
+        return index
+
+
+def build(root: str | Path) -> XrefIndex:
+    index = XrefIndex()
+
+    for file in xml_files(root):
+        index.add_document(read_document(file), document_path(file, root))
+
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the cross-reference graph.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = commands.add_parser('build', help="read the corpus and write the index")
+    build_parser.add_argument('--root', type=Path, default=Path(__file__).parent.parent,
+                              help="corpus root (default: parent of utils)")
+    build_parser.add_argument('--out', type=Path, default=DEFAULT_INDEX,
+                              help="index file (default: ../xrefs.json)")
+
+    query_parser = commands.add_parser('query', help="list what a document or sentence cites, or is cited by")
+    query_parser.add_argument('target',
+                              help="document path, file name, reference (52-133/2023, lm 82/2014) or sentence ID")
+    query_parser.add_argument('--backward', action='store_true', help="list documents citing the target")
+    query_parser.add_argument('--hops', type=int, default=1, help="hops to follow, 0 for all (default: 1)")
+    query_parser.add_argument('--index', type=Path, default=DEFAULT_INDEX,
+                              help="index file (default: ../xrefs.json)")
+    query_parser.add_argument('--json', action='store_true', help="print JSON")
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        index = build(args.root)
+        index.save(args.out)
+        edges = sum(len(keys) for keys in index.forward.values())
+        print(f"Wrote {edges:,} references from {len(index.forward):,} documents to {args.out}")
+        return
+
+    if not args.index.exists():
+        print(f"Error: Index not found: {args.index} (run `xrefs.py build` first)")
+        sys.exit(1)
+
+    index = XrefIndex.load(args.index)
+    hops = args.hops or None
+
+    if args.target in index.sentences and not args.backward:
+        result = {index.node(key): (1, [args.target]) for key in index.sentences[args.target]}
+    else:
+        node = index.resolve(args.target)
+
+        if node is None:
+            print(f"Error: No document or reference found for '{args.target}'")
+            sys.exit(1)
+
+        result = index.referenced_by(node, hops) if args.backward else index.references(node, hops)
+
+    if args.json:
+        rows = [{'node': node, 'hops': depth, 'sentences': ids} for node, (depth, ids) in result.items()]
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return
+
+    for node, (depth, ids) in result.items():
+        cited = ", ".join(i if i is not None else "header" for i in ids)
+        print(f"{'  ' * (depth - 1)}{node}  [{cited}]")
+
+
+if __name__ == '__main__':
+    main()